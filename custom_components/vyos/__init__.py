@@ -1,9 +1,14 @@
 """Support for VyOS Routers."""
 
 import logging
+import voluptuous as vol
 
 from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CYCLES,
+    DEFAULT_PROFILE_CYCLES,
     ENTRIES_VERSION,
+    SERVICE_PROFILE_POLL,
     CONF_DETECTION_TIME,
     DOMAIN,
     CONF_TRACKER_INTERFACE,
@@ -14,17 +19,28 @@ from .const import (
     UPDATE_LISTENER,
     VYOS_API,
 )
-from .router import VyOSApiDataUpdateCoordinator
-from .vyosapi import VyOSApi, VyOSApiError
+from .router import VyOSApiDataUpdateCoordinator, history_store
+from .vyos_client.api import VyOSApi, VyOSApiError
 
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.const import CONF_API_KEY, CONF_URL, CONF_VERIFY_SSL
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import aiohttp_client
+import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
 
 _LOGGER = logging.getLogger(__name__)
 
+PROFILE_POLL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
 
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
     """Migrate old entries merging all of them in one."""
@@ -104,9 +120,29 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     update_listener = config_entry.add_update_listener(async_update_options)
     hass.data[DOMAIN][config_entry.entry_id][UPDATE_LISTENER] = update_listener
 
+    async_register_services(hass)
+
     return True
 
 
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the services shared by all VyOS config entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE_POLL):
+        return
+
+    async def async_profile_poll(call: ServiceCall) -> None:
+        """Profile the next poll cycles of one config entry."""
+        entry_id: str = call.data[ATTR_CONFIG_ENTRY_ID]
+        if entry_id not in hass.data.get(DOMAIN, {}):
+            raise HomeAssistantError(f"VyOS config entry {entry_id} is not loaded")
+        coordinator: VyOSApiDataUpdateCoordinator = hass.data[DOMAIN][entry_id][KEY_COORDINATOR]
+        coordinator.start_profiling(call.data[ATTR_CYCLES])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE_POLL, async_profile_poll, schema=PROFILE_POLL_SCHEMA
+    )
+
+
 async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Update options."""
     await hass.config_entries.async_reload(config_entry.entry_id)
@@ -118,6 +154,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         update_listener = hass.data[DOMAIN][entry.entry_id][UPDATE_LISTENER]
         update_listener()
+        coordinator: VyOSApiDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+        await coordinator.async_save_history()
+        coordinator.stop()
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_PROFILE_POLL)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the presence histories of a deleted config entry."""
+    await history_store(hass, entry.entry_id).async_remove()
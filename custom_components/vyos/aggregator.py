@@ -0,0 +1,99 @@
+"""
+Aggregate the sightings of the same device by several routers, this module doesn't depend on Home Assistant
+
+Each config entry registers its devices in a shared mac address index,
+a device is present when the presence state machine of any router considers it present,
+and the sighting of one router, kept while it is fresh, provides its ip and attributes.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Protocol
+
+
+class Sighting(Protocol):
+    """A device as seen by one router."""
+
+    @property
+    def last_seen(self) -> Optional[datetime]:
+        ...
+
+    @property
+    def is_present(self) -> bool:
+        ...
+
+
+class PresenceAggregator:
+    """
+    Shared mac address index of the devices of every config entry
+
+    A device has one owner entry, the one creating its entity, the other entries only contribute sightings.
+    The primary sighting, whose attributes the entity shows, is sticky: it only moves to another router
+    when the current router hasn't seen the device within the detection time,
+    so a device roaming between routers doesn't rewrite its entity at every cycle.
+    """
+
+    def __init__(self) -> None:
+        self._sightings: dict[str, dict[str, Sighting]] = {}  # mac -> entry_id -> device
+        self._owners: dict[str, str] = {}  # mac -> entry_id
+        self._primary: dict[str, str] = {}  # mac -> entry_id
+
+    def __len__(self) -> int:
+        return len(self._sightings)
+
+    def register(self, entry_id: str, devices: Iterable[tuple[str, Sighting]]) -> None:
+        """Add the devices of one entry, the devices are kept by reference so they are updated in place."""
+        for mac, device in devices:
+            entries = self._sightings.get(mac, None)
+            if entries is None:
+                entries = self._sightings[mac] = {}
+            if entries.get(entry_id, None) is not device:
+                entries[entry_id] = device
+
+    def unregister(self, entry_id: str) -> None:
+        """Remove every sighting and claim of one entry."""
+        for mac in [mac for mac, entries in self._sightings.items() if entry_id in entries]:
+            entries = self._sightings[mac]
+            del entries[entry_id]
+            if not entries:
+                del self._sightings[mac]
+            if self._primary.get(mac, None) == entry_id:
+                del self._primary[mac]
+        for mac in [mac for mac, owner in self._owners.items() if owner == entry_id]:
+            del self._owners[mac]
+
+    def claim(self, mac: str, entry_id: str) -> bool:
+        """Claim the device for the entry, return true if the entry owns it, first come first served."""
+        return self._owners.setdefault(mac, entry_id) == entry_id
+
+    def owner(self, mac: str) -> Optional[str]:
+        """Return the entry owning the device."""
+        return self._owners.get(mac, None)
+
+    def is_present(self, mac: str) -> bool:
+        """Return true if any router considers the device present."""
+        return any(device.is_present for device in self._sightings.get(mac, {}).values())
+
+    def primary(
+        self, mac: str, default: Sighting, detection_time: timedelta, now: datetime
+    ) -> Sighting:
+        """
+        Return the sighting whose attributes represent the device,
+        the current one is kept while it is fresh, otherwise the freshest one is chosen
+        """
+        entries = self._sightings.get(mac, None)
+        if not entries:
+            return default
+        current = entries.get(self._primary.get(mac, None), None)
+        if (
+            current is not None
+            and current.last_seen is not None
+            and now - current.last_seen < detection_time
+        ):
+            return current
+        entry_id, freshest = max(
+            entries.items(),
+            key=lambda item: item[1].last_seen or datetime.min.replace(tzinfo=now.tzinfo),
+        )
+        if freshest.last_seen is None:
+            return current or default
+        self._primary[mac] = entry_id
+        return freshest
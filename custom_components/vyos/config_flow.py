@@ -4,7 +4,25 @@ import logging
 import voluptuous as vol
 
 from .const import (
+    CONF_CONNTRACK_ACTIVITY,
+    CONF_CONNTRACK_MAX_ROWS,
     CONF_DETECTION_TIME,
+    CONF_EXCLUDE,
+    CONF_HISTORY_ATTRIBUTES,
+    CONF_INCLUDE,
+    CONF_REVERSE_DNS,
+    CONF_ROUTER_HEALTH,
+    CONF_TRACK_IPV6,
+    CONF_TRACK_WIREGUARD,
+    DEFAULT_CONNTRACK_ACTIVITY,
+    DEFAULT_CONNTRACK_MAX_ROWS,
+    DEFAULT_EXCLUDE,
+    DEFAULT_HISTORY_ATTRIBUTES,
+    DEFAULT_INCLUDE,
+    DEFAULT_REVERSE_DNS,
+    DEFAULT_ROUTER_HEALTH,
+    DEFAULT_TRACK_IPV6,
+    DEFAULT_TRACK_WIREGUARD,
     get_data_schema,
     DOMAIN,
     CONF_TRACKER_INTERFACE,
@@ -13,7 +31,8 @@ from .const import (
     CONF_VERIFY_SSL,
     CONF_CONFIG_VERSION_DHCP_SERVER,
 )
-from .vyosapi import VyOSApi, VyOSApiError
+from .vyos_client.api import VyOSApi, VyOSApiError
+from .vyos_client.filters import DeviceFilter
 
 from homeassistant import config_entries, core
 from homeassistant.core import callback
@@ -41,6 +60,12 @@ async def validate_input(hass: core.HomeAssistant, data):
     ]
     detection_time: list[str] = conf[CONF_DETECTION_TIME]
 
+    try:
+        DeviceFilter(conf.get(CONF_INCLUDE, DEFAULT_INCLUDE), conf.get(CONF_EXCLUDE, DEFAULT_EXCLUDE))
+    except ValueError as err:
+        _LOGGER.error("Invalid include/exclude rules: %s", err)
+        raise VyOSApiError(str(err)) from err
+
     session = aiohttp_client.async_get_clientsession(hass)
     vyos_api = VyOSApi(session, url, api_key, verify_ssl)
 
@@ -136,6 +161,15 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             default_CONF_VERIFY_SSL=data[CONF_VERIFY_SSL],
             default_CONF_TRACKER_INTERFACE=data[CONF_TRACKER_INTERFACE],
             default_CONF_DETECTION_TIME=data[CONF_DETECTION_TIME],
+            default_CONF_CONNTRACK_ACTIVITY=data.get(CONF_CONNTRACK_ACTIVITY, DEFAULT_CONNTRACK_ACTIVITY),
+            default_CONF_CONNTRACK_MAX_ROWS=data.get(CONF_CONNTRACK_MAX_ROWS, DEFAULT_CONNTRACK_MAX_ROWS),
+            default_CONF_REVERSE_DNS=data.get(CONF_REVERSE_DNS, DEFAULT_REVERSE_DNS),
+            default_CONF_TRACK_WIREGUARD=data.get(CONF_TRACK_WIREGUARD, DEFAULT_TRACK_WIREGUARD),
+            default_CONF_TRACK_IPV6=data.get(CONF_TRACK_IPV6, DEFAULT_TRACK_IPV6),
+            default_CONF_INCLUDE=data.get(CONF_INCLUDE, DEFAULT_INCLUDE),
+            default_CONF_EXCLUDE=data.get(CONF_EXCLUDE, DEFAULT_EXCLUDE),
+            default_CONF_ROUTER_HEALTH=data.get(CONF_ROUTER_HEALTH, DEFAULT_ROUTER_HEALTH),
+            default_CONF_HISTORY_ATTRIBUTES=data.get(CONF_HISTORY_ATTRIBUTES, DEFAULT_HISTORY_ATTRIBUTES),
         )
 
         return self.async_show_form(
@@ -13,6 +13,53 @@ DEFAULT_CONFIG_VERSION_DHCP_SERVER: Final = 7
 CONF_TRACKER_INTERFACE: Final = "tracker_interfaces"
 CONF_DETECTION_TIME: Final = "detection_time"
 DEFAULT_DETECTION_TIME: Final = 300
+CONF_CONNTRACK_ACTIVITY: Final = "conntrack_activity"
+DEFAULT_CONNTRACK_ACTIVITY: Final = False
+CONF_CONNTRACK_MAX_ROWS: Final = "conntrack_max_rows"
+DEFAULT_CONNTRACK_MAX_ROWS: Final = 50000
+CONF_REVERSE_DNS: Final = "reverse_dns"
+DEFAULT_REVERSE_DNS: Final = False
+REVERSE_DNS_TTL: Final = 60 * 60
+REVERSE_DNS_NEGATIVE_TTL: Final = 10 * 60
+REVERSE_DNS_CACHE_SIZE: Final = 1024
+REVERSE_DNS_MAX_CONCURRENT: Final = 4
+# comma separated rules `net:<cidr>`, `pool:<shared-network-name>`, `iface:<interface>`, `mac:<prefix or glob>`
+CONF_INCLUDE: Final = "include"
+DEFAULT_INCLUDE: Final = ""
+CONF_EXCLUDE: Final = "exclude"
+DEFAULT_EXCLUDE: Final = ""
+CONF_TRACK_IPV6: Final = "track_ipv6"
+DEFAULT_TRACK_IPV6: Final = True
+CONF_TRACK_WIREGUARD: Final = "track_wireguard"
+DEFAULT_TRACK_WIREGUARD: Final = False
+CONF_ROUTER_HEALTH: Final = "router_health"
+DEFAULT_ROUTER_HEALTH: Final = True
+CONF_HISTORY_ATTRIBUTES: Final = "history_attributes"
+DEFAULT_HISTORY_ATTRIBUTES: Final = False
+
+SOURCE_ARP: Final = "arp"
+SOURCE_NDP: Final = "ndp"
+SOURCE_DHCP_LEASE: Final = "dhcp_lease"
+SOURCE_STATIC_MAPPING: Final = "static_mapping"
+SOURCE_INTERFACES: Final = "interfaces"
+SOURCE_CONNTRACK: Final = "conntrack"
+SOURCE_WIREGUARD: Final = "wireguard"
+SOURCE_HEALTH: Final = "health"
+# refresh interval (seconds) of each data source, the coordinator polls at the fastest one
+# with the default options this is about 580 requests per hour, against 1080 when every source was polled every 10 seconds
+SOURCE_REFRESH_INTERVALS: Final = {
+    SOURCE_ARP: 10,
+    SOURCE_NDP: 30,
+    SOURCE_DHCP_LEASE: 60,
+    SOURCE_STATIC_MAPPING: 15 * 60,
+    SOURCE_INTERFACES: 60 * 60,
+    SOURCE_CONNTRACK: 30,
+    SOURCE_WIREGUARD: 30,
+    SOURCE_HEALTH: 5 * 60,
+}
+# a source is due a bit early so scheduling jitter doesn't push it to the next tick
+SOURCE_REFRESH_SLACK: Final = 1
+
 ATTR_DEVICE_TRACKER = {
     "lease_state",
     "lease_start",
@@ -22,9 +69,30 @@ ATTR_DEVICE_TRACKER = {
     "hostname",
     "interface",
     "arp_state",
+    "ipv6_addresses",
+    "conntrack_flows",
+    "conntrack_bytes",
+    "dns_hostname",
+    "public_key",
+    "endpoint",
+    "latest_handshake",
 }
 
 KEY_COORDINATOR = "coordinator"
+# hass.data key of the presence aggregator shared by every config entry
+DATA_PRESENCE_AGGREGATOR: Final = "vyos_presence_aggregator"
+
+EVENT_DEVICE_JOINED: Final = "vyos_device_joined"
+EVENT_DEVICE_LEFT: Final = "vyos_device_left"
+
+SERVICE_PROFILE_POLL: Final = "profile_poll"
+ATTR_CONFIG_ENTRY_ID: Final = "config_entry_id"
+ATTR_CYCLES: Final = "cycles"
+DEFAULT_PROFILE_CYCLES: Final = 5
+
+# presence history of the devices, saved at most this often in seconds
+HISTORY_STORAGE_VERSION: Final = 1
+HISTORY_SAVE_DELAY: Final = 5 * 60
 
 UPDATE_LISTENER: Final = "update_listener"
 
@@ -32,7 +100,7 @@ VYOS_API: Final = "vyos_api"
 
 DOMAIN: Final = "vyos"
 
-PLATFORMS = [Platform.DEVICE_TRACKER]
+PLATFORMS = [Platform.DEVICE_TRACKER, Platform.SENSOR]
 
 
 def get_data_schema(
@@ -42,6 +110,15 @@ def get_data_schema(
         default_CONF_VERIFY_SSL: bool = False,
         default_CONF_TRACKER_INTERFACE: str = "",
         default_CONF_DETECTION_TIME: int = DEFAULT_DETECTION_TIME,
+        default_CONF_CONNTRACK_ACTIVITY: bool = DEFAULT_CONNTRACK_ACTIVITY,
+        default_CONF_CONNTRACK_MAX_ROWS: int = DEFAULT_CONNTRACK_MAX_ROWS,
+        default_CONF_REVERSE_DNS: bool = DEFAULT_REVERSE_DNS,
+        default_CONF_TRACK_WIREGUARD: bool = DEFAULT_TRACK_WIREGUARD,
+        default_CONF_TRACK_IPV6: bool = DEFAULT_TRACK_IPV6,
+        default_CONF_INCLUDE: str = DEFAULT_INCLUDE,
+        default_CONF_EXCLUDE: str = DEFAULT_EXCLUDE,
+        default_CONF_ROUTER_HEALTH: bool = DEFAULT_ROUTER_HEALTH,
+        default_CONF_HISTORY_ATTRIBUTES: bool = DEFAULT_HISTORY_ATTRIBUTES,
 ):
     return vol.Schema(
         {
@@ -55,6 +132,19 @@ def get_data_schema(
                 default=default_CONF_TRACKER_INTERFACE,
             ): cv.string,
             vol.Optional(CONF_DETECTION_TIME, default=default_CONF_DETECTION_TIME): int,
+            vol.Optional(CONF_CONNTRACK_ACTIVITY, default=default_CONF_CONNTRACK_ACTIVITY): cv.boolean,
+            vol.Optional(CONF_CONNTRACK_MAX_ROWS, default=default_CONF_CONNTRACK_MAX_ROWS): int,
+            vol.Optional(CONF_REVERSE_DNS, default=default_CONF_REVERSE_DNS): cv.boolean,
+            vol.Optional(CONF_TRACK_WIREGUARD, default=default_CONF_TRACK_WIREGUARD): cv.boolean,
+            vol.Optional(CONF_TRACK_IPV6, default=default_CONF_TRACK_IPV6): cv.boolean,
+            vol.Optional(
+                CONF_INCLUDE,
+                msg="Comma separated rules net:<cidr>, pool:<name>, iface:<interface>, mac:<prefix or glob>",
+                default=default_CONF_INCLUDE,
+            ): cv.string,
+            vol.Optional(CONF_EXCLUDE, default=default_CONF_EXCLUDE): cv.string,
+            vol.Optional(CONF_ROUTER_HEALTH, default=default_CONF_ROUTER_HEALTH): cv.boolean,
+            vol.Optional(CONF_HISTORY_ATTRIBUTES, default=default_CONF_HISTORY_ATTRIBUTES): cv.boolean,
         }
     )
 
@@ -71,6 +161,13 @@ VyOSDeviceDataType = dict[
         "hostname",
         "interface",
         "arp_state",
+        "ipv6_addresses",
+        "conntrack_flows",
+        "conntrack_bytes",
+        "dns_hostname",
+        "public_key",
+        "endpoint",
+        "latest_handshake",
     ],
     str,
 ]
@@ -11,7 +11,7 @@ from typing import Any, Optional
 from datetime import datetime
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -111,6 +111,8 @@ async def async_setup_entry(
             and entity.domain == DEVICE_TRACKER
         ):
 
+            # the entities of this entry are owned by it, even when another router saw the device first
+            coordinator.aggregator.claim(entity.unique_id, config_entry.entry_id)
             if (
                 entity.unique_id in coordinator.vyos_data.devices
                 or entity.unique_id not in coordinator.vyos_data.all_devices
@@ -134,10 +136,21 @@ def update_items(
     async_add_entities: AddEntitiesCallback,
     tracked: dict[str, VyOSApiDataUpdateCoordinatorTracker],
 ):
-    """Update tracked device state from the hub."""
+    """Update tracked device state from the hub, a device seen by several routers gets a single entity."""
+    entry_id = coordinator.config_entry.entry_id
+    registry = entity_registry.async_get(coordinator.hass)
     new_tracked: list[VyOSApiDataUpdateCoordinatorTracker] = []
     for mac, device in coordinator.vyos_data.devices.items():
-        if mac not in tracked:
+        if mac in tracked:
+            continue
+        registry_entity_id = registry.async_get_entity_id(DEVICE_TRACKER, DOMAIN, mac)
+        if (
+            registry_entity_id is not None
+            and registry.async_get(registry_entity_id).config_entry_id != entry_id
+        ):
+            # the entity belongs to another router
+            continue
+        if coordinator.aggregator.claim(mac, entry_id):
             tracked[mac] = VyOSApiDataUpdateCoordinatorTracker(device, coordinator)
             new_tracked.append(tracked[mac])
 
@@ -181,17 +194,44 @@ class VyOSApiDataUpdateCoordinatorTracker(
         self.device = device
         self._attr_name = str(device.name)
         self._attr_unique_id = device.mac
+        self._written_is_connected: Optional[bool] = None
+        self._written_attrs: Optional[dict[str, Any]] = None
+        self._written_ip_address: Optional[str] = None
 
     @property
-    def is_connected(self) -> bool:
-        """Return true if the client is connected to the network."""
+    def primary_device(self) -> VyOSDevice:
+        """Return the device as seen by the router showing it, which may be another router."""
+        return self.coordinator.primary_device(self.device)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Write the state only when the connection, the attributes or the ip changed,
+        a device roaming between routers keeps its primary router while it is fresh, so roaming writes nothing
+        """
+        is_connected = self.is_connected
+        device = self.primary_device
+        attrs = device.attrs
+        if self._attr_name == slugify(self.device.mac) and device.name != self._attr_name:
+            # the device got a hostname after it was named after its mac address
+            self._attr_name = str(device.name)
+            self._written_attrs = None
+        ip_address = device.ip_address
         if (
-            self.device.last_seen
-            and (dt_util.utcnow() - self.device.last_seen)
-            < self.coordinator.option_detection_time
+            is_connected == self._written_is_connected
+            and attrs is self._written_attrs
+            and ip_address == self._written_ip_address
         ):
-            return True
-        return False
+            return
+        self._written_is_connected = is_connected
+        self._written_attrs = attrs
+        self._written_ip_address = ip_address
+        self.async_write_ha_state()
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true if the client is connected to the network."""
+        return self.coordinator.is_device_connected(self.device)
 
     @property
     def source_type(self) -> str:
@@ -201,19 +241,21 @@ class VyOSApiDataUpdateCoordinatorTracker(
     @property
     def hostname(self) -> str:
         """Return the hostname of the client."""
-        return self.device.name
+        return self.primary_device.name
 
     @property
-    def mac_address(self) -> str:
-        """Return the mac address of the client."""
+    def mac_address(self) -> Optional[str]:
+        """Return the mac address of the client, None for a WireGuard peer."""
+        if self.device.is_wireguard:
+            return None
         return self.device.mac
 
     @property
     def ip_address(self) -> str:
         """Return the mac address of the client."""
-        return self.device.ip_address
+        return self.primary_device.ip_address
 
     @property
     def extra_state_attributes(self) -> Optional[dict[str, Any]]:
         """Return the device state attributes."""
-        return self.device.attrs if self.is_connected else None
+        return self.primary_device.attrs if self.is_connected else None
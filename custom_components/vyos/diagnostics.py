@@ -0,0 +1,40 @@
+"""Diagnostics support for VyOS."""
+from __future__ import annotations
+
+from .const import DOMAIN, KEY_COORDINATOR
+from .router import VyOSApiDataUpdateCoordinator
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_API_KEY
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.diagnostics import async_redact_data
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: VyOSApiDataUpdateCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ][KEY_COORDINATOR]
+
+    detection_time = coordinator.option_detection_time.total_seconds()
+    return {
+        "entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "device_count": len(coordinator.vyos_data.devices),
+        "profiling_in_progress": coordinator.profiler is not None,
+        "last_profile": coordinator.last_profile,
+        "presence_history": {
+            mac: {
+                "present": device.is_present,
+                "confidence": round(device.presence_confidence, 3),
+                "away_timeout": round(device.away_timeout(detection_time)),
+                **device.history.as_dict(),
+            }
+            for mac, device in coordinator.vyos_data.devices.items()
+        },
+    }
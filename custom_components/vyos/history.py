@@ -0,0 +1,199 @@
+"""
+Recent presence history of one device, this module doesn't depend on Home Assistant
+
+The history is held in fixed size ring buffers backed by arrays, so its memory doesn't grow with the uptime,
+and serialises to a few hundred bytes per device.
+
+### Serialised format (little endian)
+
+```
+header   B version, H transitions size, H transitions count, H samples size, H samples count
+buffers  transition times (I), transition values (B), sample times (I), sample values (B)
+         each buffer is ordered from the oldest to the newest entry
+```
+"""
+import sys
+import struct
+
+from array import array
+from typing import Iterator, Optional
+
+TRANSITIONS_SIZE = 64
+SAMPLES_SIZE = 128
+# an arp state sample is recorded when the state changes, or at least this often in seconds
+SAMPLE_INTERVAL = 60
+FLAP_WINDOW = 24 * 3600
+
+# arp state stored in one byte, 0 when the device is not in the neighbor tables
+ARP_STATE_CODES: dict[Optional[str], int] = {
+    None: 0,
+    "REACHABLE": 1,
+    "STALE": 2,
+    "DELAY": 3,
+    "PROBE": 4,
+    "C": 5,
+    "M": 6,
+    "P": 7,
+}
+ARP_STATE_NAMES: dict[int, Optional[str]] = {code: state for state, code in ARP_STATE_CODES.items()}
+UNKNOWN_ARP_STATE_CODE = 255
+
+
+class RingBuffer:
+    """Fixed size ring buffer of `(timestamp, value)`, timestamps in seconds and values in one byte."""
+
+    __slots__ = ("_times", "_values", "_next", "_count")
+
+    def __init__(self, size: int) -> None:
+        self._times = array("I", [0]) * size
+        self._values = array("B", [0]) * size
+        self._next = 0
+        self._count = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._values)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: int) -> None:
+        """Add an entry, overwriting the oldest one when full."""
+        self._times[self._next] = int(timestamp)
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Iterate from the oldest to the newest entry."""
+        start = (self._next - self._count) % self.size
+        for offset in range(self._count):
+            index = (start + offset) % self.size
+            yield self._times[index], self._values[index]
+
+    def last(self) -> Optional[tuple[int, int]]:
+        """Return the newest entry."""
+        if not self._count:
+            return None
+        index = (self._next - 1) % self.size
+        return self._times[index], self._values[index]
+
+    def count_since(self, timestamp: float) -> int:
+        """Return the number of entries not older than the timestamp, walking from the newest."""
+        count = 0
+        index = self._next
+        for _ in range(self._count):
+            index = (index - 1) % self.size
+            if self._times[index] < timestamp:
+                break
+            count += 1
+        return count
+
+    def ordered_arrays(self) -> tuple[array, array]:
+        """Return the times and values ordered from the oldest to the newest."""
+        start = (self._next - self._count) % self.size
+        times = (self._times[start:] + self._times[:start])[:self._count]
+        values = (self._values[start:] + self._values[:start])[:self._count]
+        return times, values
+
+    def load(self, times: array, values: array) -> None:
+        """Replace the content with entries ordered from the oldest to the newest, keeping the newest ones."""
+        self._next = 0
+        self._count = 0
+        for timestamp, value in zip(times[-self.size:], values[-self.size:]):
+            self.append(timestamp, value)
+
+
+class PresenceHistory:
+    """Recent presence transitions and arp state samples of one device."""
+
+    __slots__ = ("transitions", "samples")
+
+    HEADER = struct.Struct("<BHHHH")
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self.transitions = RingBuffer(TRANSITIONS_SIZE)
+        self.samples = RingBuffer(SAMPLES_SIZE)
+
+    def record_transition(self, now: float, present: bool) -> None:
+        """Record the device joining or leaving."""
+        self.transitions.append(now, int(present))
+
+    def record_sample(self, now: float, arp_state: Optional[str]) -> None:
+        """Record the arp state when it changed or when the last sample is older than `SAMPLE_INTERVAL`."""
+        code = ARP_STATE_CODES.get(arp_state, UNKNOWN_ARP_STATE_CODE)
+        last = self.samples.last()
+        if last is not None and last[1] == code and now - last[0] < SAMPLE_INTERVAL:
+            return
+        self.samples.append(now, code)
+
+    def flap_count(self, now: float, window: float = FLAP_WINDOW) -> int:
+        """Return the number of transitions within the window, bounded by `TRANSITIONS_SIZE`."""
+        return self.transitions.count_since(now - window)
+
+    def as_dict(self) -> dict[str, list[list]]:
+        """Return the history as lists, for the diagnostics."""
+        return {
+            "transitions": [
+                [timestamp, "joined" if value else "left"] for timestamp, value in self.transitions
+            ],
+            "arp_state_samples": [
+                [timestamp, ARP_STATE_NAMES.get(value, "unknown")] for timestamp, value in self.samples
+            ],
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialise the history."""
+        transition_times, transition_values = self.transitions.ordered_arrays()
+        sample_times, sample_values = self.samples.ordered_arrays()
+        if sys.byteorder == "big":
+            transition_times.byteswap()
+            sample_times.byteswap()
+        return b"".join(
+            (
+                self.HEADER.pack(
+                    self.VERSION,
+                    self.transitions.size,
+                    len(transition_values),
+                    self.samples.size,
+                    len(sample_values),
+                ),
+                transition_times.tobytes(),
+                transition_values.tobytes(),
+                sample_times.tobytes(),
+                sample_values.tobytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PresenceHistory":
+        """Deserialise a history, raise ValueError when the data is invalid."""
+        history = cls()
+        try:
+            version, _, transition_count, _, sample_count = cls.HEADER.unpack_from(data, 0)
+        except struct.error as err:
+            raise ValueError("Truncated presence history") from err
+        if version != cls.VERSION:
+            raise ValueError(f"Unknown presence history version {version}")
+        offset = cls.HEADER.size
+        buffers: list[array] = []
+        for typecode, count in (
+            ("I", transition_count),
+            ("B", transition_count),
+            ("I", sample_count),
+            ("B", sample_count),
+        ):
+            buffer = array(typecode)
+            end = offset + buffer.itemsize * count
+            if end > len(data):
+                raise ValueError("Truncated presence history")
+            buffer.frombytes(data[offset:end])
+            if typecode == "I" and sys.byteorder == "big":
+                buffer.byteswap()
+            buffers.append(buffer)
+            offset = end
+        history.transitions.load(buffers[0], buffers[1])
+        history.samples.load(buffers[2], buffers[3])
+        return history
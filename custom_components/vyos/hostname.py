@@ -0,0 +1,122 @@
+"""
+Resolve device hostname from ip address using reverse DNS, results are kept in a TTL/LRU cache
+"""
+import time
+import socket
+import asyncio
+import logging
+
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Generic, Iterable, Optional, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_KT = TypeVar("_KT")
+_VT = TypeVar("_VT")
+
+TaskFactory = Callable[[Coroutine[Any, Any, None], str], asyncio.Task]
+
+
+class TTLCache(Generic[_KT, _VT]):
+    """
+    LRU cache where every entry expires after its own ttl
+
+    The least recently used entry is dropped when `max_size` is reached.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[_KT, tuple[float, _VT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: _KT, now: Optional[float] = None) -> Optional[tuple[_VT]]:
+        """Return a 1-tuple of the value, or None when the key is missing or expired."""
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if (now if now is not None else time.monotonic()) >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return (value,)
+
+    def set(self, key: _KT, value: _VT, ttl: float, now: Optional[float] = None) -> None:
+        """Store the value for `ttl` seconds."""
+        self._entries[key] = ((now if now is not None else time.monotonic()) + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class ReverseDNSResolver:
+    """
+    Resolve ip address to hostname in the background, so it never delays the poll cycle
+
+    `lookup` only reads the cache, `resolve_in_background` starts the lookups of the ip addresses
+    that are neither cached nor in flight. Failed lookups are cached for `negative_ttl`.
+    The lookups use the resolver of the host (`getnameinfo`), which is typically forwarded to the router.
+    `create_task` starts each lookup from its coroutine and name, the tasks are also kept to be cancelled.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        negative_ttl: float,
+        max_size: int,
+        max_concurrent: int,
+        create_task: Optional[TaskFactory] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_concurrent = max_concurrent
+        self._cache: TTLCache[str, Optional[str]] = TTLCache(max_size)
+        self._in_flight: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._create_task = create_task
+
+    def lookup(self, ip: str) -> Optional[str]:
+        """Return the cached hostname of the ip address, None if unknown or not resolvable."""
+        cached = self._cache.get(ip)
+        return cached[0] if cached is not None else None
+
+    def resolve_in_background(self, ips: Iterable[str]) -> None:
+        """Start resolving the ip addresses that are not cached yet, without waiting for them."""
+        for ip in ips:
+            if not ip or ip in self._in_flight or self._cache.get(ip) is not None:
+                continue
+            self._in_flight.add(ip)
+            name = f"vyos reverse dns {ip}"
+            if self._create_task is not None:
+                task = self._create_task(self._resolve(ip), name)
+            else:
+                task = asyncio.get_running_loop().create_task(self._resolve(ip), name=name)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, ip: str) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                try:
+                    hostname, _port = await asyncio.get_running_loop().getnameinfo(
+                        (ip, 0), socket.NI_NAMEREQD
+                    )
+                except (OSError, UnicodeError) as err:
+                    _LOGGER.debug("Reverse DNS lookup of %s failed: %s", ip, err)
+                    self._cache.set(ip, None, self.negative_ttl)
+                else:
+                    self._cache.set(ip, hostname, self.ttl)
+        finally:
+            self._in_flight.discard(ip)
+
+    def cancel(self) -> None:
+        """Cancel the lookups in flight."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        self._in_flight.clear()
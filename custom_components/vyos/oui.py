@@ -0,0 +1,154 @@
+"""
+Lookup the vendor of a mac address from the bundled IEEE OUI database
+
+The database `oui.bin` is memory mapped on first use, so only the pages touched by the lookups are loaded.
+
+### File format (big endian)
+
+```
+header   8s magic, I record count
+records  Q key, I name offset    -- sorted by key, key = (prefix left aligned on 48 bits << 8) | prefix bits
+names    B length, utf-8 name    -- deduplicated, referenced by offset from the start of the names section
+```
+"""
+import os
+import mmap
+import bisect
+import struct
+import logging
+
+from typing import Iterable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+OUI_DB_PATH = os.path.join(os.path.dirname(__file__), "oui.bin")
+
+
+def mac_to_int(mac: str) -> Optional[int]:
+    """`aa:bb:cc:dd:ee:ff`, `aa-bb-cc-dd-ee-ff` or `aabb.ccdd.eeff` to int, None if invalid."""
+    digits = mac.replace(":", "").replace("-", "").replace(".", "")
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def is_locally_administered(mac: str) -> bool:
+    """Whether the mac address is locally administered, which is the case for randomised mac."""
+    mac_int = mac_to_int(mac)
+    return mac_int is not None and bool((mac_int >> 40) & 0x02)
+
+
+class _RecordKeys:
+    """Sequence view of the record keys, to bisect the mapped file without reading it."""
+
+    def __init__(self, buffer: mmap.mmap, offset: int, count: int, record: struct.Struct) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+        self._record = record
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return self._record.unpack_from(self._buffer, self._offset + index * self._record.size)[0]
+
+
+class OUIDatabase:
+    """Memory mapped OUI database, lookup is a binary search on the 36, 28 then 24 bits prefix."""
+
+    MAGIC = b"VYOSOUI1"
+    HEADER = struct.Struct(">8sI")
+    RECORD = struct.Struct(">QI")
+    PREFIX_BITS = (36, 28, 24)
+
+    def __init__(self, path: str = OUI_DB_PATH) -> None:
+        self.path = path
+        self._buffer: Optional[mmap.mmap] = None
+        self._keys: Optional[_RecordKeys] = None
+        self._names_offset = 0
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        """Whether `load` has been called, even if the database is unavailable."""
+        return self._loaded
+
+    def load(self) -> None:
+        """Map the database file, this is blocking I/O."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "rb") as db_file:
+                buffer = mmap.mmap(db_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("OUI database %s is not available: %s", self.path, err)
+            return
+        magic, count = self.HEADER.unpack_from(buffer, 0)
+        if magic != self.MAGIC:
+            _LOGGER.warning("OUI database %s has an unknown format", self.path)
+            buffer.close()
+            return
+        self._buffer = buffer
+        self._keys = _RecordKeys(buffer, self.HEADER.size, count, self.RECORD)
+        self._names_offset = self.HEADER.size + count * self.RECORD.size
+
+    def close(self) -> None:
+        """Unmap the database file."""
+        if self._buffer is not None:
+            self._keys = None
+            self._buffer.close()
+            self._buffer = None
+        self._loaded = False
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """Return the vendor of the mac address, None when unknown or when the database is not loaded."""
+        if self._keys is None:
+            return None
+        mac_int = mac_to_int(mac)
+        if mac_int is None:
+            return None
+        for bits in self.PREFIX_BITS:
+            shift = 48 - bits
+            key = (((mac_int >> shift) << shift) << 8) | bits
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                _key, name_offset = self.RECORD.unpack_from(
+                    self._buffer, self.HEADER.size + index * self.RECORD.size
+                )
+                start = self._names_offset + name_offset
+                length = self._buffer[start]
+                return self._buffer[start + 1:start + 1 + length].decode("utf-8")
+        return None
+
+    @classmethod
+    def build(cls, entries: Iterable[tuple[int, int, str]]) -> bytes:
+        """
+        Build the database file content from `(prefix, bits, vendor)` entries,
+        where `prefix` holds the first `bits` bits of the mac address
+        """
+        records: dict[int, str] = {}
+        for prefix, bits, vendor in entries:
+            records[((prefix << (48 - bits)) << 8) | bits] = vendor
+
+        names = bytearray()
+        name_offsets: dict[str, int] = {}
+        packed_records = bytearray()
+        for key in sorted(records):
+            vendor = records[key]
+            if vendor not in name_offsets:
+                encoded = vendor.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+                name_offsets[vendor] = len(names)
+                names.append(len(encoded))
+                names.extend(encoded)
+            packed_records.extend(cls.RECORD.pack(key, name_offsets[vendor]))
+
+        return cls.HEADER.pack(cls.MAGIC, len(records)) + bytes(packed_records) + bytes(names)
+
+
+# shared by every config entry, nothing is read until `load` is called
+OUI_DATABASE = OUIDatabase()
@@ -0,0 +1,202 @@
+"""
+Presence confidence of one device, this module doesn't depend on Home Assistant
+
+Every poll turns the router observations into an evidence between 0 and 1,
+the confidence follows the evidence, quickly upward and slowly downward,
+and the device only changes between home and away when the confidence crosses a threshold:
+it joins above `PRESENCE_ENTER_CONFIDENCE` and leaves below `PRESENCE_LEAVE_CONFIDENCE`.
+A silent device, STALE or missing from the neighbor tables, stays above the leave threshold until its away timeout,
+unless its DHCP lease ended.
+
+The away timeout of each device is learned from the gaps between its REACHABLE sightings,
+with the smoothed mean and mean deviation used for TCP retransmission timeouts (RFC 6298),
+the configured detection time stays the fallback and the upper bound.
+It bounds every silent device, STALE or missing from the neighbor tables.
+A gap is the silence between two REACHABLE runs, consecutive REACHABLE polls only measure the poll interval
+and would shrink the timeout of a device that sleeps between short bursts, so they aren't learned.
+"""
+from typing import Any, Mapping, Optional
+
+from .vyos_client.neighbor import NEIGHBOR_STATE_STRENGTH
+
+PRESENCE_ENTER_CONFIDENCE = 0.6
+PRESENCE_LEAVE_CONFIDENCE = 0.2
+# fraction of the gap between the confidence and the evidence closed on each poll
+CONFIDENCE_RISE = 0.7
+CONFIDENCE_FALL = 0.3
+
+# evidence of an arp state, by strength, STALE decays toward the leave threshold with the time since the last REACHABLE
+STATE_EVIDENCE = {4: 1.0, 3: 0.8, 2: 0.5, 1: 0.7}
+STALE_STRENGTH = 1
+# an active lease slows the decay of a silent device, an ended lease speeds it up
+LEASE_ACTIVE_BONUS = 0.1
+LEASE_ENDED_FACTOR = 0.5
+LEASE_ENDED_STATES = frozenset({"expired", "free", "released", "abandoned"})
+
+# gains of the gap mean and mean deviation, the timeout is the mean plus `GAP_DEVIATION_FACTOR` deviations
+GAP_MEAN_GAIN = 0.125
+GAP_DEVIATION_GAIN = 0.25
+GAP_DEVIATION_FACTOR = 4
+# the learned timeout is used after this many gaps, and never goes below `MIN_LEARNED_TIMEOUT` seconds
+MIN_GAP_SAMPLES = 5
+MIN_LEARNED_TIMEOUT = 60
+
+
+def presence_evidence(
+    arp_state: Optional[str],
+    lease_state: Optional[str],
+    active: bool,
+    since_reachable: Optional[float],
+    detection_time: float,
+) -> float:
+    """
+    Return the evidence of presence of one observation
+
+    `active` is true when any source saw the device, `since_reachable` is the number of seconds since
+    the last strong sighting, and `detection_time` is the number of seconds after which a silent device is away.
+    A STALE device decays toward the leave threshold, which it only reaches after `detection_time`.
+    """
+    if active and arp_state is None:
+        # seen by conntrack or wireguard, which only report live traffic
+        evidence = 1.0
+    else:
+        # a device missing from the neighbor tables is as uncertain as a STALE one,
+        # the entry of a sleeping phone is garbage collected or turns FAILED long before it leaves
+        strength = NEIGHBOR_STATE_STRENGTH.get(arp_state, 0) if active else STALE_STRENGTH
+        evidence = STATE_EVIDENCE.get(strength, 0.0)
+        if strength == STALE_STRENGTH:
+            if since_reachable is None:
+                evidence = 0.0  # never seen
+            else:
+                evidence = PRESENCE_LEAVE_CONFIDENCE + (evidence - PRESENCE_LEAVE_CONFIDENCE) * max(
+                    0.0, 1.0 - since_reachable / detection_time
+                )
+    if lease_state is not None:
+        if lease_state in LEASE_ENDED_STATES:
+            evidence *= LEASE_ENDED_FACTOR
+        elif lease_state == "active" and 0.0 < evidence < 1.0:
+            evidence = min(1.0, evidence + LEASE_ACTIVE_BONUS)
+    return evidence
+
+
+class PresenceConfidence:
+    """Presence state machine of one device, with hysteresis between home and away."""
+
+    __slots__ = (
+        "confidence",
+        "present",
+        "last_reachable",
+        "last_strong",
+        "was_strong",
+        "gap_mean",
+        "gap_deviation",
+        "gap_samples",
+    )
+
+    def __init__(self) -> None:
+        self.confidence = 0.0
+        self.present = False
+        self.last_reachable: Optional[float] = None
+        # the gaps are only measured between real strong sightings, not from an assumed stale one
+        self.last_strong: Optional[float] = None
+        self.was_strong = False
+        self.gap_mean = 0.0
+        self.gap_deviation = 0.0
+        self.gap_samples = 0
+
+    def state(self) -> dict[str, Any]:
+        """
+        Return the state kept across restarts, so a present device doesn't join again after a restart
+        and keeps its learned timeout
+        """
+        return {
+            "present": self.present,
+            "confidence": round(self.confidence, 4),
+            "gap_mean": round(self.gap_mean, 3),
+            "gap_deviation": round(self.gap_deviation, 3),
+            "gap_samples": self.gap_samples,
+        }
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        """Restore a state returned by `state`, invalid values are ignored."""
+        confidence = state.get("confidence", None)
+        if isinstance(confidence, (int, float)) and 0.0 <= confidence <= 1.0:
+            self.confidence = float(confidence)
+            self.present = bool(state.get("present", False))
+        gap_mean = state.get("gap_mean", None)
+        gap_deviation = state.get("gap_deviation", None)
+        gap_samples = state.get("gap_samples", None)
+        if (
+            isinstance(gap_mean, (int, float))
+            and isinstance(gap_deviation, (int, float))
+            and isinstance(gap_samples, int)
+            and gap_mean >= 0
+            and gap_deviation >= 0
+            and gap_samples >= 0
+        ):
+            self.gap_mean = float(gap_mean)
+            self.gap_deviation = float(gap_deviation)
+            self.gap_samples = gap_samples
+
+    def _learn_gap(self, gap: float) -> None:
+        """Update the smoothed gap mean and mean deviation, in constant memory."""
+        if self.gap_samples == 0:
+            self.gap_mean = gap
+            self.gap_deviation = gap / 2
+        else:
+            self.gap_deviation += (abs(gap - self.gap_mean) - self.gap_deviation) * GAP_DEVIATION_GAIN
+            self.gap_mean += (gap - self.gap_mean) * GAP_MEAN_GAIN
+        self.gap_samples += 1
+
+    def away_timeout(self, detection_time: float) -> float:
+        """Return the learned away timeout of the device, the detection time until enough gaps are seen."""
+        if self.gap_samples < MIN_GAP_SAMPLES:
+            return detection_time
+        learned = self.gap_mean + GAP_DEVIATION_FACTOR * self.gap_deviation
+        return min(detection_time, max(MIN_LEARNED_TIMEOUT, learned))
+
+    def observe(
+        self,
+        arp_state: Optional[str],
+        lease_state: Optional[str],
+        active: bool,
+        now: float,
+        detection_time: float,
+    ) -> bool:
+        """
+        Update the confidence from one poll, `now` is a timestamp in seconds,
+        return true when the device changed between home and away
+        """
+        is_strong = active and (
+            arp_state is None or NEIGHBOR_STATE_STRENGTH.get(arp_state, 0) > STALE_STRENGTH
+        )
+        if is_strong:
+            if not self.was_strong and self.last_strong is not None:
+                gap = now - self.last_strong
+                # a gap longer than the detection time is an absence, not a refresh interval
+                if gap < detection_time:
+                    self._learn_gap(gap)
+            self.last_strong = now
+            self.last_reachable = now
+        elif active and self.last_reachable is None:
+            # first sighting of a stale device, after a restart for instance, its age is unknown
+            self.last_reachable = now
+        self.was_strong = is_strong
+        since_reachable = now - self.last_reachable if self.last_reachable is not None else None
+
+        away_timeout = self.away_timeout(detection_time)
+        evidence = presence_evidence(
+            arp_state, lease_state, active, since_reachable, away_timeout
+        )
+        rate = CONFIDENCE_RISE if evidence > self.confidence else CONFIDENCE_FALL
+        self.confidence += (evidence - self.confidence) * rate
+        if since_reachable is None or since_reachable >= away_timeout:
+            # the learned timeout, bounded by the detection time, is the upper bound of a silent device
+            self.confidence = min(self.confidence, PRESENCE_LEAVE_CONFIDENCE)
+
+        was_present = self.present
+        if not was_present and self.confidence >= PRESENCE_ENTER_CONFIDENCE:
+            self.present = True
+        elif was_present and self.confidence <= PRESENCE_LEAVE_CONFIDENCE:
+            self.present = False
+        return self.present != was_present
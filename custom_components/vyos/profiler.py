@@ -0,0 +1,147 @@
+"""
+Capture cProfile and tracemalloc data of the coordinator poll cycles on demand
+"""
+import io
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# tracemalloc is global to the process, it is shared by the profilers of every config entry
+# and stopped when the last of them is done, unless it was already tracing before the first one
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _acquire_tracemalloc() -> None:
+    """Start tracemalloc for one more profiler."""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    """Release tracemalloc for one profiler, it is stopped with the last one when the profilers started it."""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+class PollProfiler:
+    """
+    Record the next `cycles` poll cycles of a coordinator
+
+    The profiler is enabled only while a cycle is running, so the wall time between cycles is not recorded.
+    Note that cProfile records everything running on the event loop thread during the cycle,
+    not only the VyOS calls.
+    """
+
+    TOP_FUNCTIONS = 30
+    TOP_ALLOCATIONS = 15
+
+    def __init__(self, cycles: int) -> None:
+        self.cycles = cycles
+        self.remaining_cycles = cycles
+        self.cycle_durations: list[float] = []
+        self._profile = cProfile.Profile()
+        self._tracing = False
+        self._cycle_start: float = 0.0
+
+    def _release(self) -> None:
+        if self._tracing:
+            self._tracing = False
+            _release_tracemalloc()
+
+    def start_cycle(self) -> None:
+        """
+        Start recording one poll cycle
+
+        raise ValueError when another profiler is already active on the thread (Python 3.12+),
+        the caller should then `cancel` this profiler
+        """
+        if not self._tracing:
+            _acquire_tracemalloc()
+            self._tracing = True
+        self._cycle_start = time.perf_counter()
+        self._profile.enable()
+
+    def stop_cycle(self) -> bool:
+        """Stop recording one poll cycle, return True when all cycles are recorded."""
+        self._profile.disable()
+        self.cycle_durations.append(time.perf_counter() - self._cycle_start)
+        self.remaining_cycles -= 1
+        return self.remaining_cycles <= 0
+
+    def finish(self) -> tuple[dict[str, Any], str]:
+        """
+        Release tracemalloc and build the summary, this is CPU heavy and should run in the executor
+
+        return the summary dict (for diagnostics) and the full text report
+        """
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+        finally:
+            self._release()
+
+        stats_stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stats_stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.TOP_FUNCTIONS)
+
+        top_allocations = [
+            {
+                "location": str(stat.traceback),
+                "size": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[: self.TOP_ALLOCATIONS]
+        ]
+        summary = {
+            "cycles": len(self.cycle_durations),
+            "cycle_durations": [round(duration, 6) for duration in self.cycle_durations],
+            "mean_cycle_duration": (
+                sum(self.cycle_durations) / len(self.cycle_durations)
+                if self.cycle_durations
+                else None
+            ),
+            "traced_memory_current": traced_current,
+            "traced_memory_peak": traced_peak,
+            "top_allocations": top_allocations,
+        }
+
+        report = io.StringIO()
+        report.write(f"cycles: {summary['cycles']}\n")
+        report.write(f"cycle durations (s): {summary['cycle_durations']}\n")
+        report.write(f"traced memory current/peak (bytes): {traced_current}/{traced_peak}\n\n")
+        report.write("top allocations:\n")
+        for allocation in top_allocations:
+            report.write(f"  {allocation['location']}: size={allocation['size']} count={allocation['count']}\n")
+        report.write("\n")
+        report.write(stats_stream.getvalue())
+        return summary, report.getvalue()
+
+    def write(self, path: str, report: str) -> None:
+        """Write the text report to `path` and the raw cProfile stats next to it, this is blocking I/O."""
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(report)
+        self._profile.dump_stats(f"{path}.prof")
+        _LOGGER.info("VyOS poll profile written to %s", path)
+
+    def cancel(self) -> None:
+        """Stop tracing without building a report."""
+        self._profile.disable()
+        self._release()
+
@@ -1,50 +1,162 @@
+import time
+import base64
+import asyncio
 import logging
 
-from .util import deep_update
 from .const import (
     ATTR_DEVICE_TRACKER,
     CONF_URL,
     CONF_DETECTION_TIME,
+    CONF_EXCLUDE,
+    CONF_HISTORY_ATTRIBUTES,
+    CONF_INCLUDE,
     CONF_TRACKER_INTERFACE,
     CONF_CONFIG_VERSION_DHCP_SERVER,
+    CONF_CONNTRACK_ACTIVITY,
+    CONF_CONNTRACK_MAX_ROWS,
+    CONF_REVERSE_DNS,
+    CONF_ROUTER_HEALTH,
+    CONF_TRACK_IPV6,
+    CONF_TRACK_WIREGUARD,
+    DATA_PRESENCE_AGGREGATOR,
+    DEFAULT_CONNTRACK_ACTIVITY,
+    DEFAULT_CONNTRACK_MAX_ROWS,
     DEFAULT_DETECTION_TIME,
+    DEFAULT_EXCLUDE,
+    DEFAULT_HISTORY_ATTRIBUTES,
+    DEFAULT_INCLUDE,
+    DEFAULT_REVERSE_DNS,
+    DEFAULT_ROUTER_HEALTH,
+    DEFAULT_TRACK_IPV6,
+    DEFAULT_TRACK_WIREGUARD,
+    DOMAIN,
+    EVENT_DEVICE_JOINED,
+    EVENT_DEVICE_LEFT,
+    HISTORY_SAVE_DELAY,
+    HISTORY_STORAGE_VERSION,
+    REVERSE_DNS_CACHE_SIZE,
+    REVERSE_DNS_MAX_CONCURRENT,
+    REVERSE_DNS_NEGATIVE_TTL,
+    REVERSE_DNS_TTL,
+    SOURCE_ARP,
+    SOURCE_CONNTRACK,
+    SOURCE_DHCP_LEASE,
+    SOURCE_HEALTH,
+    SOURCE_INTERFACES,
+    SOURCE_NDP,
+    SOURCE_REFRESH_INTERVALS,
+    SOURCE_REFRESH_SLACK,
+    SOURCE_STATIC_MAPPING,
+    SOURCE_WIREGUARD,
     VyOSDeviceDataType,
 )
-from .vyosapi import VyOSApi
+from .aggregator import PresenceAggregator
+from .history import PresenceHistory
+from .hostname import ReverseDNSResolver
+from .oui import OUI_DATABASE, is_locally_administered
+from .presence import PresenceConfidence
+from .profiler import PollProfiler
+from .vyos_client.api import VyOSApi, VyOSApiError
+from .vyos_client.filters import DeviceFilter
+from .vyos_client.merge import WIREGUARD_KEY_PREFIX, SubnetIndex, dhcp_lease_filter, merge_devices
+from .vyos_client.sources import (
+    fetch_static_mapping,
+    fetch_wireguard_config,
+    fetch_wireguard_peers,
+)
 
-from typing import Any, Literal, Optional, Union
+from typing import Any, Awaitable, Coroutine, Iterable, Literal, Optional
 from datetime import datetime, timedelta
-from functools import reduce
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.util import dt as dt_util, slugify
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# slugified attribute keys are computed once instead of on every state write
+ATTR_DEVICE_TRACKER_KEYS: tuple[tuple[str, str], ...] = tuple(
+    (attr, slugify(attr)) for attr in sorted(ATTR_DEVICE_TRACKER)
+)
+
+
 class VyOSDevice:
     """Represents a network device."""
 
-    def __init__(self, mac: str, params: VyOSDeviceDataType) -> None:
+    def __init__(
+        self,
+        mac: str,
+        params: VyOSDeviceDataType,
+        manufacturer: Optional[str] = None,
+        history_attributes: bool = False,
+    ) -> None:
         """Initialize the network device."""
         self._mac = mac
         self._params = params
+        self._manufacturer = manufacturer
+        self._is_wireguard = mac.startswith(WIREGUARD_KEY_PREFIX)
+        self._random_mac = is_locally_administered(mac)
         self._last_seen: Optional[datetime] = None
-        self._attrs: dict[str, Any] = {}
+        self._presence = PresenceConfidence()
+        self._history = PresenceHistory()
+        self._history_attributes = history_attributes
+        self._flaps_24h: Optional[int] = None
+        self._flaps_counted_at = 0.0
+        self._attrs: dict[str, Any] = self._build_attrs(params)
+
+    def _build_attrs(self, params: VyOSDeviceDataType) -> dict[str, Any]:
+        """Build the attributes dict from the device params."""
+        attrs = {
+            attr_key: params[attr]
+            for attr, attr_key in ATTR_DEVICE_TRACKER_KEYS
+            if attr in params
+        }
+        if self._manufacturer is not None:
+            attrs["manufacturer"] = self._manufacturer
+        if not self._is_wireguard:
+            attrs["random_mac"] = self._random_mac
+        if self._flaps_24h is not None:
+            attrs["flaps_24h"] = self._flaps_24h
+        return attrs
+
+    @property
+    def is_wireguard(self) -> bool:
+        """Return whether the device is a WireGuard peer, keyed by public key instead of mac."""
+        return self._is_wireguard
+
+    @property
+    def public_key(self) -> Optional[str]:
+        """Return the public key of a WireGuard peer, None for other devices."""
+        return self._mac[len(WIREGUARD_KEY_PREFIX):] if self._is_wireguard else None
+
+    @property
+    def manufacturer(self) -> Optional[str]:
+        """Return device manufacturer from the OUI database."""
+        return self._manufacturer
 
     @property
     def name(self) -> str:
         """Return device name."""
-        return self._params.get("hostname", slugify(self.mac))
+        return (
+            self._params.get("hostname", None)
+            or self._params.get("dns_hostname", None)
+            or slugify(self.mac)
+        )
 
     @property
     def ip_address(self) -> str:
         """Return device primary ip address."""
         return self._params["ip"]
 
+    @property
+    def interface(self) -> Optional[str]:
+        """Return the interface the device was last seen on."""
+        return self._params.get("interface", None)
+
     @property
     def mac(self) -> str:
         """Return device mac."""
@@ -55,13 +167,47 @@ class VyOSDevice:
         """Return device last seen."""
         return self._last_seen
 
+    @property
+    def is_present(self) -> bool:
+        """Return the presence decided by the confidence state machine."""
+        return self._presence.present
+
+    @property
+    def presence_confidence(self) -> float:
+        """Return the presence confidence, between 0 and 1."""
+        return self._presence.confidence
+
+    @property
+    def presence_state(self) -> dict[str, Any]:
+        """Return the presence state kept across restarts."""
+        return self._presence.state()
+
+    def restore_presence(self, state: dict[str, Any]) -> None:
+        """Restore the presence state saved by the previous run."""
+        self._presence.restore(state)
+
+    def away_timeout(self, detection_time: float) -> float:
+        """Return the away timeout learned from the gaps between REACHABLE sightings, bounded by the detection time."""
+        return self._presence.away_timeout(detection_time)
+
+    @property
+    def history(self) -> PresenceHistory:
+        """Return the recent presence transitions and arp state samples."""
+        return self._history
+
+    @history.setter
+    def history(self, history: PresenceHistory) -> None:
+        """Replace the history, when it is restored from the storage."""
+        self._history = history
+
     @property
     def attrs(self) -> dict[str, Any]:
-        """Return device attributes."""
-        attr_data = self._params
-        for attr in ATTR_DEVICE_TRACKER:
-            if attr in attr_data:
-                self._attrs[slugify(attr)] = attr_data[attr]
+        """
+        Return device attributes.
+
+        The same dict object is returned until the params change, so it could be compared by identity.
+        """
+        return self._attrs
 
     def update(
         self,
@@ -69,11 +215,36 @@ class VyOSDevice:
         active: bool = False,
     ) -> None:
         """Update Device params."""
-        if params is not None:
+        if params is not None and params is not self._params:
+            if params != self._params:
+                self._attrs = self._build_attrs(params)
             self._params = params
         if active:
             self._last_seen = dt_util.utcnow()
-        return self._attrs
+
+    def observe_presence(self, active: bool, now: float, detection_time: float) -> bool:
+        """
+        Feed one poll to the presence state machine and the history, return true when the device joined or left.
+        The flap count attribute is refreshed on every change and hourly, so it also decreases as the changes age.
+        """
+        arp_state = self._params.get("arp_state", None) if active else None
+        changed = self._presence.observe(
+            arp_state,
+            self._params.get("lease_state", None),
+            active,
+            now,
+            detection_time,
+        )
+        self._history.record_sample(now, arp_state)
+        if changed:
+            self._history.record_transition(now, self._presence.present)
+        if self._history_attributes and (changed or now - self._flaps_counted_at >= 3600):
+            self._flaps_counted_at = now
+            flaps_24h = self._history.flap_count(now)
+            if flaps_24h != self._flaps_24h:
+                self._flaps_24h = flaps_24h
+                self._attrs = self._build_attrs(self._params)
+        return changed
 
 
 class VyOSData:
@@ -90,7 +261,45 @@ class VyOSData:
         self.tracker_interfaces: list[str] = [
             iface.strip() for iface in conf[CONF_TRACKER_INTERFACE].split(",")
         ]
+        self.conntrack_activity: bool = conf.get(
+            CONF_CONNTRACK_ACTIVITY, DEFAULT_CONNTRACK_ACTIVITY
+        )
+        self.conntrack_max_rows: int = conf.get(
+            CONF_CONNTRACK_MAX_ROWS, DEFAULT_CONNTRACK_MAX_ROWS
+        )
+        # records dropped by the include/exclude rules never become devices
+        device_filter = DeviceFilter(
+            conf.get(CONF_INCLUDE, DEFAULT_INCLUDE), conf.get(CONF_EXCLUDE, DEFAULT_EXCLUDE)
+        )
+        self.device_filter: Optional[DeviceFilter] = device_filter if device_filter else None
+        self.track_ipv6: bool = conf.get(CONF_TRACK_IPV6, DEFAULT_TRACK_IPV6)
+        self.track_wireguard: bool = conf.get(
+            CONF_TRACK_WIREGUARD, DEFAULT_TRACK_WIREGUARD
+        )
+        self.router_health: bool = conf.get(CONF_ROUTER_HEALTH, DEFAULT_ROUTER_HEALTH)
+        self.history_attributes: bool = conf.get(
+            CONF_HISTORY_ATTRIBUTES, DEFAULT_HISTORY_ATTRIBUTES
+        )
+        self._wireguard_config: Optional[dict[str, Any]] = None
+        # the leases and static mappings are located in the dhcp subnets while parsed, so the filter rules see
+        # their interface, only the records kept by the rules are cached
+        self.subnet_index = SubnetIndex(())
+        self._wireguard_config_fetched_at: float = 0.0
+        self.resolver: Optional[ReverseDNSResolver] = (
+            ReverseDNSResolver(
+                ttl=REVERSE_DNS_TTL,
+                negative_ttl=REVERSE_DNS_NEGATIVE_TTL,
+                max_size=REVERSE_DNS_CACHE_SIZE,
+                max_concurrent=REVERSE_DNS_MAX_CONCURRENT,
+                create_task=self._create_background_task,
+            )
+            if conf.get(CONF_REVERSE_DNS, DEFAULT_REVERSE_DNS)
+            else None
+        )
+        self._source_results: dict[str, Any] = {}
+        self._source_fetched_at: dict[str, float] = {}
         self.all_devices: dict[str, VyOSDeviceDataType] = {}
+        self.active_keys: set[str] = set()
         self.devices: dict[str, VyOSDevice] = {}
         self.conf_mac_name: Literal["mac", "mac-address"]
         self.load_config_paths()
@@ -105,10 +314,25 @@ class VyOSData:
                 mac_devices[mac] = device
         return mac_devices
 
+    def _create_background_task(self, target: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+        """Start a task tracked by Home Assistant, which doesn't block the startup."""
+        create_background_task = getattr(self.hass, "async_create_background_task", None)
+        if create_background_task is None:
+            # Home Assistant before 2023.2
+            return self.hass.async_create_task(target)
+        return create_background_task(target, name)
+
     def restore_device(self, mac: str) -> None:
         """Restore a missing device after restart."""
         device_data = self.all_devices[mac]
-        self.devices[mac] = VyOSDevice(mac, device_data)
+        self.devices[mac] = self.create_device(mac, device_data)
+
+    def create_device(self, mac: str, params: VyOSDeviceDataType) -> VyOSDevice:
+        """Create a device, looking up its manufacturer unless the mac is randomised."""
+        manufacturer = None if is_locally_administered(mac) else OUI_DATABASE.lookup(mac)
+        return VyOSDevice(
+            mac, params, manufacturer=manufacturer, history_attributes=self.history_attributes
+        )
 
     def load_config_paths(self) -> None:
         """
@@ -122,85 +346,240 @@ class VyOSData:
         else:
             self.conf_mac_name = "mac"
 
+    @property
+    def source_refresh_intervals(self) -> dict[str, int]:
+        """Refresh interval in seconds of every enabled data source."""
+        intervals = {
+            source: SOURCE_REFRESH_INTERVALS[source]
+            for source in (SOURCE_ARP, SOURCE_DHCP_LEASE, SOURCE_STATIC_MAPPING, SOURCE_INTERFACES)
+        }
+        if self.track_ipv6:
+            intervals[SOURCE_NDP] = SOURCE_REFRESH_INTERVALS[SOURCE_NDP]
+        if self.conntrack_activity:
+            intervals[SOURCE_CONNTRACK] = SOURCE_REFRESH_INTERVALS[SOURCE_CONNTRACK]
+        if self.track_wireguard:
+            intervals[SOURCE_WIREGUARD] = SOURCE_REFRESH_INTERVALS[SOURCE_WIREGUARD]
+        if self.router_health:
+            intervals[SOURCE_HEALTH] = SOURCE_REFRESH_INTERVALS[SOURCE_HEALTH]
+        return intervals
+
+    def _fetch_source(self, source: str) -> Awaitable[Any]:
+        """Return the awaitable fetching one data source."""
+        if source == SOURCE_ARP:
+            return self.api.get_present_arp_clients(
+                self.tracker_interfaces, record_filter=self.device_filter
+            )
+        if source == SOURCE_NDP:
+            return self.api.get_present_ipv6_neighbors(
+                self.tracker_interfaces, record_filter=self.device_filter
+            )
+        if source == SOURCE_DHCP_LEASE:
+            return self.api.get_dhcp_lease(
+                record_filter=dhcp_lease_filter(self.subnet_index, self.device_filter)
+            )
+        if source == SOURCE_STATIC_MAPPING:
+            return self.fetch_static_mapping()
+        if source == SOURCE_INTERFACES:
+            return self.api.get_interface_addresses()
+        if source == SOURCE_CONNTRACK:
+            return self.api.get_conntrack_activity(
+                max_rows=self.conntrack_max_rows,
+                max_clients=self.api.CONNTRACK_MAX_CLIENTS,
+                ip_filter=(
+                    (lambda ip: self.device_filter({"ip": ip}))
+                    if self.device_filter is not None
+                    else None
+                ),
+            )
+        if source == SOURCE_WIREGUARD:
+            return self.fetch_wireguard_peers()
+        if source == SOURCE_HEALTH:
+            return self.fetch_system_health()
+        raise ValueError(f"Unknown data source {source}")
+
+    async def refresh_sources(self) -> None:
+        """
+        Concurrently fetch the data sources whose refresh interval has elapsed,
+        the others keep their last result
+
+        The interfaces, then the static mappings, are fetched before the other sources when due,
+        as the dhcp subnets they index locate the leases and static mappings while parsed.
+        The leases are fetched again when the subnets change, as they were located in the previous ones.
+        """
+        now = time.monotonic()
+        due_sources = [
+            source
+            for source, interval in self.source_refresh_intervals.items()
+            if source not in self._source_fetched_at
+            or now - self._source_fetched_at[source] >= interval - SOURCE_REFRESH_SLACK
+        ]
+        if SOURCE_INTERFACES in due_sources and SOURCE_STATIC_MAPPING not in due_sources:
+            due_sources.append(SOURCE_STATIC_MAPPING)
+        error: Optional[BaseException] = None
+        for source in (SOURCE_INTERFACES, SOURCE_STATIC_MAPPING):
+            if source in due_sources:
+                error = await self._fetch_sources([source], now) or error
+        if (
+            self._source_fetched_at.get(SOURCE_STATIC_MAPPING, None) == now
+            and SOURCE_DHCP_LEASE not in due_sources
+        ):
+            due_sources.append(SOURCE_DHCP_LEASE)
+        error = (
+            await self._fetch_sources(
+                [
+                    source
+                    for source in due_sources
+                    if source not in (SOURCE_INTERFACES, SOURCE_STATIC_MAPPING)
+                ],
+                now,
+            )
+            or error
+        )
+        if error is not None:
+            raise error
+
+    async def _fetch_sources(self, sources: list[str], now: float) -> Optional[BaseException]:
+        """Concurrently fetch the sources and cache their results, return the first error."""
+        results = await asyncio.gather(
+            *(self._fetch_source(source) for source in sources),
+            return_exceptions=True,
+        )
+        error: Optional[BaseException] = None
+        for source, result in zip(sources, results):
+            if isinstance(result, BaseException):
+                error = error or result
+                continue
+            self._source_results[source] = result
+            self._source_fetched_at[source] = now
+            if source == SOURCE_INTERFACES:
+                self.check_tracker_interfaces(result)
+        return error
+
+    def check_tracker_interfaces(self, interfaces: Iterable[str]) -> None:
+        """Warn when a configured tracker interface doesn't exist on the router anymore."""
+        for interface in self.tracker_interfaces:
+            if interface and interface not in interfaces:
+                _LOGGER.warning(
+                    "Specified VyOS tracker interface %s is not found", interface
+                )
+
+    async def fetch_static_mapping(self) -> dict[str, dict[Literal["mac", "ip", "hostname"], str]]:
+        """
+        Get static mapping from the dhcp-server config, using mac address as a key,
+        the dhcp subnets are indexed with the last interface addresses to locate and filter them
+        """
+        static_mapping, self.subnet_index = await fetch_static_mapping(
+            self.api,
+            self.conf_mac_name,
+            self._source_results.get(SOURCE_INTERFACES, None),
+            self.device_filter,
+        )
+        return static_mapping
+
+    async def fetch_wireguard_peers(self) -> dict[str, dict[str, Any]]:
+        """
+        Get the peers of every WireGuard interface, using public key as a key.
+
+        The interfaces and peer names come from the config, which is only refreshed at the static mapping cadence,
+        so a cycle normally costs one concurrent request per interface.
+        """
+        now = time.monotonic()
+        if (
+            self._wireguard_config is None
+            or now - self._wireguard_config_fetched_at
+            >= SOURCE_REFRESH_INTERVALS[SOURCE_STATIC_MAPPING]
+        ):
+            self._wireguard_config = await fetch_wireguard_config(self.api)
+            if not self._wireguard_config:
+                _LOGGER.debug("No WireGuard interface found in the config")
+            self._wireguard_config_fetched_at = now
+        return await fetch_wireguard_peers(self.api, self._wireguard_config)
+
+    async def fetch_system_health(self) -> dict[str, Optional[float]]:
+        """
+        Get the router health, a failure only makes the health sensors unavailable until the next refresh,
+        the device tracking doesn't depend on it
+        """
+        try:
+            return await self.api.get_system_health()
+        except VyOSApiError as err:
+            _LOGGER.debug("Unable to get the VyOS router health: %r", err)
+            return {}
+
+    @property
+    def system_health(self) -> dict[str, Optional[float]]:
+        """
+        Return the last router health, with the conntrack usage when the conntrack activity is enabled,
+        empty when the health is disabled or not fetched yet
+        """
+        health = dict(self._source_results.get(SOURCE_HEALTH, None) or {})
+        conntrack_activity = self._source_results.get(SOURCE_CONNTRACK, None)
+        if health and self.conntrack_activity and conntrack_activity is not None:
+            health["conntrack_entries"] = conntrack_activity.total_flows
+            if health.get("conntrack_max", None):
+                health["conntrack_usage"] = round(
+                    conntrack_activity.total_flows / health["conntrack_max"] * 100, 1
+                )
+        return health
+
     async def update_devices(self) -> None:
         """Get list of devices with latest status."""
         # get from static mapping to get the hostname and mac
         # get from dhcp lease to get the hostname
         # get from arp table to know the one that is online
-        static_mapping_co_routine = self.api.get_config(
-            ["service", "dhcp-server", "shared-network-name"]
-        )
-        dhcp_lease_co_routine = self.api.get_dhcp_lease()
-        arp_table_co_routine = self.api.get_present_arp_clients(self.tracker_interfaces)
-
-        static_mapping_host_detail: dict[
-            str, dict[Literal["mac", "ip", "hostname"], str]
-        ] = {}
-
-        shared_network_name_dict: dict[str, dict[str, Any]]
-        subnet_dict: dict[str, dict[str, Any]]
-        mapping_detail: dict[
-            Literal["ip-address", "mac", "static-mapping-parameters"],
-            Union[str, list[str]],
-        ]
-        # shared_network_name = Lan
-        # subnet_name = 192.168.1.0/24
-        for _shared_network_name, shared_network_name_dict in (
-            await static_mapping_co_routine
-        )["shared-network-name"].items():
-            for _subnet_name, subnet_dict in shared_network_name_dict["subnet"].items():
-                if "static-mapping" not in subnet_dict:
-                    # This subnet doesn't have any static-mapping definition
-                    continue
-                for hostname, mapping_detail in subnet_dict["static-mapping"].items():
-                    if self.conf_mac_name not in mapping_detail:
-                        continue
-                    ip = mapping_detail.get("ip-address", None)
-                    mac = mapping_detail[self.conf_mac_name]
-                    static_mapping_host_detail[mac] = {
-                        "mac": mac,
-                        "ip": ip,
-                        "hostname": hostname,
-                    }
-
-        self.all_devices = reduce(
-            deep_update,
-            (
-                static_mapping_host_detail,
-                (await dhcp_lease_co_routine),
-                # (await arp_table_co_routine),
+        await self.refresh_sources()
+
+        # the cached source results are reused on the next cycles, merge_devices doesn't modify them
+        self.all_devices, self.active_keys = merge_devices(
+            self._source_results[SOURCE_STATIC_MAPPING],
+            self._source_results[SOURCE_DHCP_LEASE],
+            self._source_results[SOURCE_ARP],
+            ndp_table=self._source_results[SOURCE_NDP] if self.track_ipv6 else None,
+            conntrack_activity=(
+                self._source_results[SOURCE_CONNTRACK] if self.conntrack_activity else None
             ),
+            wireguard_peers=(
+                self._source_results[SOURCE_WIREGUARD] if self.track_wireguard else None
+            ),
+            device_filter=self.device_filter,
         )
         device_list = self.all_devices
 
-        # key of arp_table is ip
-        arp_table = await arp_table_co_routine
-
-        # in arp table, many ip could have the same mac address #1
-        arp_mac_to_ip: dict[str, str] = {}
-        for table_entry in arp_table.values():
-            arp_mac = table_entry.get("mac", None)
-            arp_ip = table_entry.get("ip", None)
-            if arp_mac is None:
-                continue
-            arp_mac_to_ip[arp_mac] = arp_mac_to_ip.get(arp_mac, None) or arp_ip
-        # Update device_list to add ip address, if possible
-        for mac, params in device_list.items():
-            original_ip = params.get("ip", None)
-            arp_ip = arp_mac_to_ip.get(mac, None)
-            device_list[mac].update({"ip": original_ip or arp_ip})
+        if self.resolver is not None:
+            self.update_dns_hostnames(device_list)
 
-        arp_presence_ip = {table_entry["ip"] for table_entry in arp_table.values() if table_entry.get("arp_state", None)
-                           in VyOSApi.PRESENCE_ARP_STATES}
+        if not OUI_DATABASE.loaded:
+            await self.hass.async_add_executor_job(OUI_DATABASE.load)
 
         for mac, params in device_list.items():
             if mac not in self.devices:
-                self.devices[mac] = VyOSDevice(mac, self.all_devices.get(mac, {}))
+                self.devices[mac] = self.create_device(mac, self.all_devices.get(mac, {}))
             else:
                 self.devices[mac].update(params=self.all_devices.get(mac, {}))
             # is_active = params.get("arp_state", None) in VyOSApi.PRESENCE_ARP_STATES
-            is_active = params.get("ip", None) in arp_presence_ip
-            self.devices[mac].update(active=is_active)
+            self.devices[mac].update(active=mac in self.active_keys)
+
+    def update_dns_hostnames(self, device_list: dict[str, VyOSDeviceDataType]) -> None:
+        """
+        Add the cached reverse DNS hostname to the devices without hostname,
+        the unknown ones are resolved in the background and used on a later cycle
+        """
+        unresolved_ips: list[str] = []
+        for params in device_list.values():
+            ip = params.get("ip", None)
+            if not ip or params.get("hostname", None):
+                continue
+            dns_hostname = self.resolver.lookup(ip)
+            if dns_hostname is None:
+                unresolved_ips.append(ip)
+            else:
+                params["dns_hostname"] = dns_hostname
+        self.resolver.resolve_in_background(unresolved_ips)
+
+
+def history_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the storage of the presence histories of a config entry."""
+    return Store(hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.history.{entry_id}")
 
 
 class VyOSApiDataUpdateCoordinator(DataUpdateCoordinator):
@@ -214,12 +593,30 @@ class VyOSApiDataUpdateCoordinator(DataUpdateCoordinator):
         self.config_entry: ConfigEntry = config_entry
         self.api = api
         self.vyos_data = VyOSData(hass, config_entry, api)
+        self.profiler: Optional[PollProfiler] = None
+        self._present_macs: Optional[set[str]] = None
+        # several routers could see the same device, their sightings are merged across config entries
+        self.aggregator: PresenceAggregator = hass.data.setdefault(
+            DATA_PRESENCE_AGGREGATOR, PresenceAggregator()
+        )
+        self.last_profile: Optional[dict[str, Any]] = None
+        self.last_update_duration: Optional[float] = None
+        self._history_store = history_store(hass, config_entry.entry_id)
+        # serialised histories and presence states waiting for their device to be created,
+        # None until the storage is loaded
+        self._stored_history: Optional[dict[str, str]] = None
+        self._stored_presence: dict[str, dict[str, Any]] = {}
+        # async_delay_save restarts its timer on each call, it is only called when no save is pending
+        self._history_save_pending = False
         conf = config_entry.data
         super().__init__(
             self.hass,
             _LOGGER,
             name=f"VyOS - {conf[CONF_URL]}",
-            update_interval=timedelta(seconds=10),
+            # the coordinator ticks at the fastest source, slower sources are fetched when they are due
+            update_interval=timedelta(
+                seconds=min(self.vyos_data.source_refresh_intervals.values())
+            ),
         )
 
     @property
@@ -231,7 +628,174 @@ class VyOSApiDataUpdateCoordinator(DataUpdateCoordinator):
             )
         )
 
+    def start_profiling(self, cycles: int) -> None:
+        """Profile the next `cycles` poll cycles, replacing a profiling already in progress."""
+        if self.profiler is not None:
+            self.profiler.cancel()
+        self.profiler = PollProfiler(cycles)
+
+    def stop_profiling(self) -> None:
+        """Drop a profiling in progress without writing a report."""
+        if self.profiler is not None:
+            self.profiler.cancel()
+            self.profiler = None
+
+    def stop(self) -> None:
+        """Stop the background work of the coordinator."""
+        self.stop_profiling()
+        self.aggregator.unregister(self.config_entry.entry_id)
+        if self.vyos_data.resolver is not None:
+            self.vyos_data.resolver.cancel()
+
     async def _async_update_data(self) -> None:
         """Update VyOSApi devices information."""
         # await self.hass.async_add_executor_job(self.vyos_data.update_devices)
-        await self.vyos_data.update_devices()
+        profiler = self.profiler
+        start = time.perf_counter()
+        if self._stored_history is None:
+            await self._async_load_history()
+        if profiler is not None:
+            try:
+                profiler.start_cycle()
+            except ValueError as err:
+                # another profiler is active, a second config entry or the profiler integration
+                _LOGGER.warning("Unable to profile the VyOS poll cycle: %s", err)
+                profiler.cancel()
+                if self.profiler is profiler:
+                    self.profiler = None
+                profiler = None
+        if profiler is None:
+            await self.vyos_data.update_devices()
+        else:
+            try:
+                await self.vyos_data.update_devices()
+            finally:
+                # a profiler replaced or stopped during the cycle is already cancelled
+                if profiler.stop_cycle() and self.profiler is profiler:
+                    self.profiler = None
+                    await self._async_save_profile(profiler)
+        self.last_update_duration = time.perf_counter() - start
+        self.update_presence()
+        self.aggregator.register(self.config_entry.entry_id, self.vyos_data.devices.items())
+        self.fire_presence_events()
+
+    async def _async_load_history(self) -> None:
+        """Load the histories saved by the previous run, they are restored when their device is created."""
+        stored = await self._history_store.async_load()
+        self._stored_history = dict(stored.get("devices", {})) if stored else {}
+        self._stored_presence = dict(stored.get("presence", {})) if stored else {}
+
+    def _restore_history(self, mac: str, device: VyOSDevice) -> None:
+        """Restore the saved history and presence state of a new device."""
+        state = self._stored_presence.pop(mac, None)
+        if state is not None:
+            device.restore_presence(state)
+        encoded = self._stored_history.pop(mac, None)
+        if encoded is None:
+            return
+        try:
+            device.history = PresenceHistory.from_bytes(base64.b64decode(encoded))
+        except ValueError as err:
+            _LOGGER.debug("Dropping the invalid presence history of %s: %s", mac, err)
+
+    @callback
+    def _history_data(self) -> dict[str, Any]:
+        """Return the histories and presence states to save, the ones not restored yet are kept."""
+        # called when the data is written, a later change schedules the next save
+        self._history_save_pending = False
+        devices = dict(self._stored_history or {})
+        presence = dict(self._stored_presence)
+        for mac, device in self.vyos_data.devices.items():
+            if len(device.history.transitions) or len(device.history.samples):
+                devices[mac] = base64.b64encode(device.history.to_bytes()).decode("ascii")
+            presence[mac] = device.presence_state
+        return {"devices": devices, "presence": presence}
+
+    async def async_save_history(self) -> None:
+        """Save the histories now, when the entry is unloaded."""
+        if self._stored_history is not None:
+            await self._history_store.async_save(self._history_data())
+
+    def update_presence(self) -> None:
+        """Feed the poll to the presence state machine and the history of every device."""
+        now = dt_util.utcnow().timestamp()
+        detection_time = self.option_detection_time.total_seconds()
+        active_keys = self.vyos_data.active_keys
+        for mac, device in self.vyos_data.devices.items():
+            if self._stored_history or self._stored_presence:
+                self._restore_history(mac, device)
+            device.observe_presence(mac in active_keys, now, detection_time)
+        # the confidences change on every poll, so the histories are written every `HISTORY_SAVE_DELAY` seconds
+        if not self._history_save_pending:
+            self._history_save_pending = True
+            self._history_store.async_delay_save(self._history_data, HISTORY_SAVE_DELAY)
+
+    def is_device_connected(self, device: VyOSDevice) -> bool:
+        """Return true if the presence state machine of this router, or of any other, considers the device home."""
+        return device.is_present or self.aggregator.is_present(device.mac)
+
+    def primary_device(self, device: VyOSDevice) -> VyOSDevice:
+        """Return the sighting of the device whose ip and attributes are shown, it changes router only when needed."""
+        return self.aggregator.primary(
+            device.mac, device, self.option_detection_time, dt_util.utcnow()
+        )
+
+    def owns_device(self, mac: str) -> bool:
+        """Return true unless another config entry owns the entity of the device."""
+        return self.aggregator.owner(mac) in (None, self.config_entry.entry_id)
+
+    def fire_presence_events(self) -> None:
+        """
+        Fire one joined and one left event per cycle, from the difference of the present devices with the previous cycle.
+        Nothing is fired on the first cycle, which only records the present devices.
+        A device seen by several routers is only reported by the config entry owning its entity.
+        """
+        present_macs = {
+            mac
+            for mac, device in self.vyos_data.devices.items()
+            if self.owns_device(mac) and self.is_device_connected(device)
+        }
+        previous_present_macs = self._present_macs
+        self._present_macs = present_macs
+        if previous_present_macs is None:
+            return
+        for event_type, macs in (
+            (EVENT_DEVICE_JOINED, present_macs - previous_present_macs),
+            (EVENT_DEVICE_LEFT, previous_present_macs - present_macs),
+        ):
+            if not macs:
+                continue
+            self.hass.bus.async_fire(
+                event_type,
+                {
+                    CONF_URL: self.config_entry.data[CONF_URL],
+                    "devices": [
+                        self._event_device_data(self.vyos_data.devices[mac]) for mac in macs
+                    ],
+                },
+            )
+
+    @staticmethod
+    def _event_device_data(device: VyOSDevice) -> dict[str, Optional[str]]:
+        """Return the compact device data carried by the joined and left events."""
+        return {
+            "mac": None if device.is_wireguard else device.mac,
+            "public_key": device.public_key,
+            "ip": device.ip_address,
+            "hostname": device.name,
+            "interface": device.interface,
+        }
+
+    async def _async_save_profile(self, profiler: PollProfiler) -> None:
+        """Build the profiling summary and write the report to the config directory."""
+        summary, report = await self.hass.async_add_executor_job(profiler.finish)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.hass.config.path(
+            f"vyos_profile_{self.config_entry.entry_id}_{timestamp}.txt"
+        )
+        summary["path"] = path
+        self.last_profile = summary
+        try:
+            await self.hass.async_add_executor_job(profiler.write, path, report)
+        except OSError:
+            _LOGGER.exception("Unable to write VyOS poll profile to %s", path)
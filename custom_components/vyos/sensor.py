@@ -0,0 +1,179 @@
+"""Router health sensors for VyOS routers."""
+from __future__ import annotations
+
+from .const import (
+    CONF_URL,
+    DOMAIN,
+    KEY_COORDINATOR,
+)
+from .router import VyOSApiDataUpdateCoordinator
+
+from typing import Callable, Optional
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, UnitOfInformation, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+
+
+@dataclass
+class VyOSSensorEntityDescription(SensorEntityDescription):
+    """Sensor reading one value of the coordinator."""
+
+    value_fn: Callable[[VyOSApiDataUpdateCoordinator], Optional[float]] = lambda _: None
+
+
+def _health_value(key: str) -> Callable[[VyOSApiDataUpdateCoordinator], Optional[float]]:
+    """Read one value of the router health."""
+    return lambda coordinator: coordinator.vyos_data.system_health.get(key, None)
+
+
+HEALTH_SENSORS: tuple[VyOSSensorEntityDescription, ...] = (
+    VyOSSensorEntityDescription(
+        key="load_1m",
+        name="CPU load (1 min)",
+        icon="mdi:cpu-64-bit",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("load_1m"),
+    ),
+    VyOSSensorEntityDescription(
+        key="load_5m",
+        name="CPU load (5 min)",
+        icon="mdi:cpu-64-bit",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("load_5m"),
+    ),
+    VyOSSensorEntityDescription(
+        key="load_15m",
+        name="CPU load (15 min)",
+        icon="mdi:cpu-64-bit",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("load_15m"),
+    ),
+    VyOSSensorEntityDescription(
+        key="memory_used_percent",
+        name="Memory usage",
+        icon="mdi:memory",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("memory_used_percent"),
+    ),
+    VyOSSensorEntityDescription(
+        key="memory_used",
+        name="Memory used",
+        icon="mdi:memory",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("memory_used"),
+    ),
+    VyOSSensorEntityDescription(
+        key="uptime",
+        name="Uptime",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_health_value("uptime"),
+    ),
+)
+
+CONNTRACK_SENSORS: tuple[VyOSSensorEntityDescription, ...] = (
+    VyOSSensorEntityDescription(
+        key="conntrack_entries",
+        name="Conntrack entries",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("conntrack_entries"),
+    ),
+    VyOSSensorEntityDescription(
+        key="conntrack_usage",
+        name="Conntrack usage",
+        icon="mdi:lan-connect",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_health_value("conntrack_usage"),
+    ),
+)
+
+POLL_SENSORS: tuple[VyOSSensorEntityDescription, ...] = (
+    VyOSSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        icon="mdi:timer-sync-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: (
+            round(coordinator.last_update_duration * 1000, 1)
+            if coordinator.last_update_duration is not None
+            else None
+        ),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the router health sensors for VyOS component."""
+    coordinator: VyOSApiDataUpdateCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ][KEY_COORDINATOR]
+
+    descriptions = list(POLL_SENSORS)
+    if coordinator.vyos_data.router_health:
+        descriptions.extend(HEALTH_SENSORS)
+        if coordinator.vyos_data.conntrack_activity:
+            descriptions.extend(CONNTRACK_SENSORS)
+
+    async_add_entities(
+        VyOSRouterSensor(coordinator, description) for description in descriptions
+    )
+
+
+class VyOSRouterSensor(CoordinatorEntity[VyOSApiDataUpdateCoordinator], SensorEntity):
+    """Representation of a VyOS router health value."""
+
+    entity_description: VyOSSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: VyOSApiDataUpdateCoordinator,
+        description: VyOSSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        url = coordinator.config_entry.data[CONF_URL]
+        router_name = urlparse(url).hostname or url
+        self._attr_name = f"VyOS {router_name} {description.name}"
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the last value, None until the value is fetched."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def available(self) -> bool:
+        """Return true when the value has been fetched."""
+        return super().available and self.native_value is not None
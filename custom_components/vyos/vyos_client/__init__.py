@@ -0,0 +1,60 @@
+"""
+Async client of the VyOS HTTP API with its table parsers and the device merge engine
+
+This package doesn't depend on Home Assistant and could be used on its own by adding its parent directory to the path:
+
+```python
+import sys
+sys.path.insert(0, "custom_components/vyos")
+
+from vyos_client import VyOSApi
+
+api = VyOSApi(None, "https://192.168.1.1:11443", "MY-HTTPS-API-PLAINTEXT-KEY")
+async for entry in api.iter_arp_entries():
+    print(entry["ip"], entry["mac"], entry["arp_state"])
+await api.close()
+```
+
+The names below are imported on first access, so importing the package only costs what is used.
+"""
+import importlib
+
+from typing import Any
+
+_EXPORTS = {
+    "VyOSApi": "api",
+    "VyOSApiError": "api",
+    "ConntrackActivity": "api",
+    "DeviceFilter": "filters",
+    "NeighborEntry": "neighbor",
+    "NeighborIndex": "neighbor",
+    "NEIGHBOR_STATE_STRENGTH": "neighbor",
+    "merge_devices": "merge",
+    "SubnetIndex": "merge",
+    "dhcp_lease_filter": "merge",
+    "parse_static_mapping": "merge",
+    "parse_wireguard_peer_names": "merge",
+    "WIREGUARD_HANDSHAKE_TIMEOUT": "merge",
+    "WIREGUARD_KEY_PREFIX": "merge",
+    "fetch_static_mapping": "sources",
+    "fetch_wireguard_config": "sources",
+    "fetch_wireguard_peers": "sources",
+    "Anonymizer": "capture",
+    "CaptureRecorder": "capture",
+    "ReplaySession": "capture",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name, None)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,842 @@
+"""
+Serve as a simple api for VyOS, only support feature for device tracker
+
+aiohttp and asyncio are only imported by the methods needing them, so importing the parsers stays cheap.
+"""
+import re
+import json
+import time
+import logging
+import itertools
+
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterator, Literal, Optional
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    import asyncio
+
+    from .capture import CaptureRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VyOSApiError(Exception):
+    """General VyOS Exeption"""
+
+
+class ConntrackActivity(dict):
+    """Active flows and bytes using source ip as a key, `total_flows` counts every row of the table"""
+
+    total_flows: int = 0
+
+
+class VyOSApi:
+    """
+    Manage VyOS api call
+
+    # Parameters
+
+    `api_url`: str -- example https://192.168.1.1:11443/
+
+    `api_key`: str -- example MY-HTTPS-API-PLAINTEXT-KEY
+
+    `verify_ssl`: bool -- whether to trust self verify certificate
+
+    `recorder`: CaptureRecorder -- optional, record every raw response with its timing to an anonymised capture
+
+    Without `websession`, the client creates its own aiohttp session on the first request, call `close` when done.
+    A `capture.ReplaySession` could be given as `websession` to replay a capture instead of calling a router.
+    """
+
+    PRESENCE_ARP_STATES = frozenset({"REACHABLE", "STALE", "DELAY", "C", "M", "P"})
+    TABLE_DELIMITER_PATTERN = re.compile(r"[^\s]+\s{0,1}[^\s]*\s*")
+    WIREGUARD_DURATION_PATTERN = re.compile(r"(\d+)\s+(year|day|hour|minute|second)s?")
+    WIREGUARD_DURATION_SECONDS = {
+        "year": 365 * 24 * 3600,
+        "day": 24 * 3600,
+        "hour": 3600,
+        "minute": 60,
+        "second": 1,
+    }
+    UPTIME_PATTERN = re.compile(r"(\d+)\s*([dhms])\b")
+    UPTIME_SECONDS = {"d": 24 * 3600, "h": 3600, "m": 60, "s": 1}
+    UPTIME_LEGACY_PATTERN = re.compile(
+        r"up\s+(?:(\d+)\s+days?,\s*)?(?:(\d+):(\d+)|(\d+)\s+min)"
+    )
+    LOAD_PATTERN = re.compile(r"(\d+)\s+minutes?:\s*([\d.]+)%")
+    LOAD_LEGACY_PATTERN = re.compile(r"load average:\s*([\d.]+),\s*([\d.]+),\s*([\d.]+)")
+    CPU_COUNT_PATTERN = re.compile(r"CPU\(s\):\s*(\d+)")
+    MEMORY_PATTERN = re.compile(r"(Total|Free|Used):\s*([\d.]+)\s*([KMGT]?)i?B?", re.IGNORECASE)
+    MEMORY_UNIT_MIB = {"": 1 / 1024 / 1024, "K": 1 / 1024, "M": 1, "G": 1024, "T": 1024 * 1024}
+    DEFAULT_CONNTRACK_TABLE_SIZE = 262144
+    # upper bound of distinct client ip aggregated from a single conntrack table
+    CONNTRACK_MAX_CLIENTS = 4096
+    CONNTRACK_INACTIVE_STATES = frozenset(
+        {"TIME_WAIT", "CLOSE", "CLOSE_WAIT", "FIN_WAIT", "LAST_ACK"}
+    )
+
+    def __init__(
+        self,
+        websession: Optional["ClientSession"],
+        api_url: str,
+        api_key: str,
+        verify_ssl: bool = False,
+        recorder: Optional["CaptureRecorder"] = None,
+    ) -> None:
+        self.websession = websession
+        self.api_url = api_url.strip("/")
+        self.api_key = api_key
+        self.verify_ssl = verify_ssl
+        self.allow_redirects = True
+        self._own_websession = False
+        self.recorder = recorder
+        self._recorder_flush: Optional["asyncio.Future[None]"] = None
+        # the cpu count of the router, only needed by vyos 1.3 and lower, fetched once, 0 when unknown
+        self._cpu_count: Optional[int] = None
+
+    async def make_request(
+        self, path: Literal["show", "retrieve"], headers: dict, payload: dict
+    ):
+        """make request to VyOS api"""
+        if self.websession is None:
+            import aiohttp
+
+            self.websession = aiohttp.ClientSession()
+            self._own_websession = True
+        started_at = time.monotonic()
+        res = await self.websession.post(
+            f"{self.api_url}/{path}",
+            headers=headers,
+            data=payload,
+            allow_redirects=self.allow_redirects,
+            verify_ssl=self.verify_ssl,
+        )
+        if self.recorder is not None:
+            # the body is kept by the response, so the caller could still read it
+            body = await res.read()
+            elapsed = time.monotonic() - started_at
+            self.recorder.record(path, payload["data"], res.status, started_at, elapsed, body)
+            # anonymising and writing is blocking, it runs in the executor while the buffer keeps filling
+            if self._recorder_flush is None or self._recorder_flush.done():
+                import asyncio
+
+                self._recorder_flush = asyncio.get_running_loop().run_in_executor(
+                    None, self.recorder.flush
+                )
+        return res
+
+    async def close(self) -> None:
+        """
+        Close the session created by the client, a session given to the client is left open,
+        wait for the recorder to write the responses, the recorder itself is left open
+        """
+        if self._recorder_flush is not None:
+            await self._recorder_flush
+            self._recorder_flush = None
+        if self._own_websession and self.websession is not None:
+            await self.websession.close()
+            self.websession = None
+            self._own_websession = False
+
+    @classmethod
+    def _parse_table(
+        cls,
+        table: str,
+        delimiter_line_index: Optional[int] = 1,  # Could be none to use the first line instead
+        column_names: list[str] = None,
+        key: Optional[str] = None,
+        filter_func: Optional[Callable[[dict[str, str]], bool]] = None,
+    ):
+        """
+        Process table style from vyos, missing data becomes empty string ''
+
+        return the rows as dict using `key` column as a key, or as lists of values when `key` is None
+
+        ### Example input
+
+        ```
+        IP address     Hardware address    State    Lease start          Lease expiration     Remaining    Pool    Hostname
+        -------------  ------------------  -------  -------------------  -------------------  -----------  ------  -------------------------------
+
+        Interface        IP Address                        S/L  Description
+        ---------        ----------                        ---  -----------
+        ```
+        """
+        rows = cls._iter_table(table, delimiter_line_index, column_names, filter_func)
+        if key is None:
+            return [list(row.values()) for row in rows]
+        return {row[key]: row for row in rows}
+
+    @classmethod
+    def _iter_table(
+        cls,
+        table: str,
+        delimiter_line_index: Optional[int] = 1,  # Could be none to use the first line instead
+        column_names: list[str] = None,
+        filter_func: Optional[Callable[[dict[str, str]], bool]] = None,
+    ) -> Iterator[dict[str, str]]:
+        """Lazily yield the rows of a table as dict, `_parse_table` collects them"""
+        lines = cls._iter_lines(table.strip())
+        header_lines = list(itertools.islice(lines, (delimiter_line_index or 0) + 1))
+        if len(header_lines) <= (delimiter_line_index or 0):
+            return
+
+        col_indice = [0]
+        start_index = 0
+        for col in cls.TABLE_DELIMITER_PATTERN.findall(header_lines[delimiter_line_index or 0]):
+            start_index += len(col)
+            col_indice.append(start_index)
+        # in some case, the message is longer than delimiter line so we use absolute end for index
+        col_indice.pop(-1)
+        col_indice.append(None)
+        slices = [slice(col_indice[i], col_indice[i + 1]) for i in range(len(col_indice) - 1)]
+
+        if column_names is None:
+            column_names = [
+                header_lines[(delimiter_line_index or 1) - 1][col_slice].strip()
+                for col_slice in slices
+            ]
+
+        for line in lines:
+            line = line.rstrip("\r")
+            row = {
+                col_name: line[col_slice].strip()
+                for col_name, col_slice in zip(column_names, slices)
+            }
+            if filter_func is None or filter_func(row):
+                yield row
+
+    @classmethod
+    def _make_neighbor_filter(
+        cls,
+        interface: list[str],
+        record_filter: Optional[Callable[[dict[str, str]], bool]] = None,
+    ) -> Callable[[dict[str, str]], bool]:
+        """Keep the neighbor entries in a presence state, on the given interfaces if any, and kept by `record_filter`"""
+        interface = frozenset(interface)
+        should_check_interface = len(interface) > 0
+
+        def filter_neighbor_entry(neighbor_entry_dict: dict[str, str]):
+            # is_valid = len(neighbor_entry_dict["mac"]) == 17 # we don't need to check mac from arp table
+            is_presence = neighbor_entry_dict["arp_state"] in cls.PRESENCE_ARP_STATES
+            is_valid_interface = (not should_check_interface) or (neighbor_entry_dict["interface"] in interface)
+            _LOGGER.debug(
+                "Filtering %s\nis_presence=%s,is_valid_interface=%s",
+                neighbor_entry_dict,
+                is_presence,
+                is_valid_interface,
+            )
+            return (
+                is_presence
+                and is_valid_interface
+                and (record_filter is None or record_filter(neighbor_entry_dict))
+            )
+
+        return filter_neighbor_entry
+
+    @classmethod
+    def _parse_ip_neighbor_lines(
+        cls,
+        table: str,
+        filter_func: Optional[Callable[[dict[str, str]], bool]] = None,
+    ):
+        """
+        Process the raw `ip -6 neighbor` output of vyos 1.3 and lower, using ip as a key
+
+        ### Example input
+
+        ```
+        fe80::1 dev eth0 lladdr 00:11:22:33:44:55 router REACHABLE
+        fe80::2 dev eth1  FAILED
+        ```
+        """
+        neighbors: dict[str, dict[str, str]] = {}
+        for line in cls._iter_lines(table.strip()):
+            tokens = line.split()
+            if len(tokens) < 2:
+                continue
+            neighbor_entry = {
+                "ip": tokens[0],
+                "interface": tokens[tokens.index("dev") + 1] if "dev" in tokens[:-1] else "",
+                "mac": tokens[tokens.index("lladdr") + 1] if "lladdr" in tokens[:-1] else "",
+                "arp_state": tokens[-1],
+            }
+            if (filter_func is None) or filter_func(neighbor_entry):
+                neighbors[neighbor_entry["ip"]] = neighbor_entry
+        return neighbors
+
+    async def get_present_arp_clients(
+        self,
+        interface: list[str] = [],
+        record_filter: Optional[Callable[[dict[str, str]], bool]] = None,
+    ):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["arp"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+
+        return dict using mac address as a key and value dict
+        """
+        # or we could `show arp interface eth1``
+        arp_clients: dict[str, dict[Literal["ip", "interface", "mac", "arp_state"], str]] = {
+            arp_entry["ip"]: arp_entry
+            async for arp_entry in self.iter_arp_entries(interface, record_filter)
+        }
+        return arp_clients
+
+    async def iter_arp_entries(
+        self,
+        interface: list[str] = [],
+        record_filter: Optional[Callable[[dict[str, str]], bool]] = None,
+    ) -> AsyncIterator[dict[Literal["ip", "interface", "mac", "arp_state"], str]]:
+        """
+        Yield the arp entries in a presence state one by one, `get_present_arp_clients` collects them,
+        rows are only parsed as they are consumed
+        """
+        arp_table_raw = await self._show(["arp"])
+        filter_arp_entry = self._make_neighbor_filter(interface, record_filter)
+        if "HWtype" in arp_table_raw.strip()[:80]:  # vyos 1.3.x and lower
+            rows = self._iter_table(
+                arp_table_raw,
+                delimiter_line_index=None,
+                column_names=["ip", "HWtype", "mac", "arp_state", "interface"],
+                filter_func=filter_arp_entry,
+            )
+        else:
+            rows = self._iter_table(
+                arp_table_raw,
+                delimiter_line_index=1,
+                column_names=["ip", "interface", "mac", "arp_state"],
+                filter_func=filter_arp_entry,
+            )
+        for row in rows:
+            yield row
+
+    async def get_present_ipv6_neighbors(
+        self,
+        interface: list[str] = [],
+        record_filter: Optional[Callable[[dict[str, str]], bool]] = None,
+    ):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["ipv6", "neighbors"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+
+        return dict using ip address as a key, with the same fields as `get_present_arp_clients`
+        """
+        neighbor_table_raw = await self._show(["ipv6", "neighbors"])
+
+        filter_neighbor_entry = self._make_neighbor_filter(interface, record_filter)
+
+        is_table = neighbor_table_raw.strip().startswith("Address")
+
+        if is_table:
+            ipv6_neighbors: dict[
+                str, dict[Literal["ip", "interface", "mac", "arp_state"], str]
+            ] = self._parse_table(
+                neighbor_table_raw,
+                delimiter_line_index=1,
+                column_names=["ip", "interface", "mac", "arp_state"],
+                key="ip",
+                filter_func=filter_neighbor_entry,
+            )
+        else:  # vyos 1.3.x and lower output the raw `ip -6 neighbor`
+            ipv6_neighbors: dict[
+                str, dict[Literal["ip", "interface", "mac", "arp_state"], str]
+            ] = self._parse_ip_neighbor_lines(neighbor_table_raw, filter_neighbor_entry)
+
+        return ipv6_neighbors
+
+    async def list_interfaces(self):
+        """List the interface names of the router"""
+        return list(await self.get_interface_addresses())
+
+    async def get_interface_addresses(self) -> dict[str, list[str]]:
+        """
+        Get the addresses of every interface, with their prefix length, using the interface name as a key
+
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["interfaces"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+        """
+        interfaces_summary_raw = await self._show(["interfaces"])
+
+        interfaces_detail = self._iter_table(
+            interfaces_summary_raw,
+            delimiter_line_index=2,
+            column_names=["interfaces", "ip", "s/l", "desc"],
+        )
+
+        # an interface with several addresses continues on the next lines, without interface name
+        # eth0             192.168.1.1/24                    u/u  LAN
+        #                  2001:db8::1/64
+        interface_addresses: dict[str, list[str]] = {}
+        interface = None
+        for if_line in interfaces_detail:
+            if if_line["interfaces"]:
+                interface = if_line["interfaces"]
+                interface_addresses[interface] = []
+            if interface is not None and if_line.get("ip", "") not in ("", "-"):
+                interface_addresses[interface].append(if_line["ip"])
+        return interface_addresses
+
+    async def get_dhcp_lease(
+        self, record_filter: Optional[Callable[[dict[str, str]], bool]] = None
+    ):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["dhcp", "server", "leases", "state", "all"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+        """
+        lease_table: dict[
+            str,
+            dict[
+                Literal[
+                    "ip",
+                    "mac",
+                    "lease_state",
+                    "lease_start",
+                    "lease_expire",
+                    "lease_remaining",
+                    "pool",
+                    "hostname",
+                ],
+                str,
+            ],
+        ] = {lease["mac"]: lease async for lease in self.iter_dhcp_leases(record_filter)}
+        return lease_table
+
+    async def iter_dhcp_leases(
+        self, record_filter: Optional[Callable[[dict[str, str]], bool]] = None
+    ) -> AsyncIterator[dict[str, str]]:
+        """
+        Yield the dhcp leases one by one, `get_dhcp_lease` collects them,
+        rows are only parsed as they are consumed
+        """
+        lease_table_raw = await self._show(["dhcp", "server", "leases", "state", "all"])
+        for row in self._iter_table(
+            lease_table_raw,
+            delimiter_line_index=1,
+            column_names=[
+                "ip",
+                "mac",
+                "lease_state",
+                "lease_start",
+                "lease_expire",
+                "lease_remaining",
+                "pool",
+                "hostname",
+            ],
+            filter_func=record_filter,
+        ):
+            yield row
+
+    @staticmethod
+    def _iter_lines(text: str):
+        """Yield line by line without materialising the list of all lines like `splitlines` does"""
+        start = 0
+        length = len(text)
+        while start < length:
+            stop = text.find("\n", start)
+            if stop == -1:
+                stop = length
+            yield text[start:stop]
+            start = stop + 1
+
+    @staticmethod
+    def _strip_port(address: str) -> str:
+        """`192.168.1.2:5353` -> `192.168.1.2`, `[fe80::1]:53` -> `fe80::1`"""
+        if address.startswith("["):
+            return address[1:address.find("]")]
+        if address.count(":") == 1:
+            return address.partition(":")[0]
+        return address
+
+    @classmethod
+    def _parse_conntrack_activity(
+        cls,
+        table: str,
+        max_rows: int,
+        max_clients: int,
+        ip_filter: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Aggregate active flows and bytes per original source ip while streaming through the table,
+        memory is bounded by `max_clients` and the work by `max_rows`,
+        `ip_filter` is called once per new source ip
+
+        Support both the table from `show conntrack table ipv4`
+
+        ```
+        Id          Original src        Original dst        Reply src           Reply dst           Protocol    State        Timeout    Mark    Zone
+        ----------  ------------------  ------------------  ------------------  ------------------  ----------  -----------  ---------  ------  ------
+        ```
+
+        and the raw `conntrack -L` lines, where bytes are only available when accounting is enabled
+
+        ```
+        tcp      6 431999 ESTABLISHED src=192.168.1.10 dst=1.1.1.1 sport=52345 dport=443 packets=3 bytes=180 src=1.1.1.1 ...
+        ```
+
+        `conntrack_bytes` is only returned when the table has byte counters, the table format never has them
+        """
+        activity: dict[str, list[int]] = {}  # ip -> [flows, bytes]
+        rejected_ips: set[str] = set()
+        has_byte_counters = False
+        # the table could be several MB, it is only stripped once
+        table = table.strip()
+        lines = cls._iter_lines(table)
+        header = next(lines, "")
+        is_raw_format = "src=" in header
+
+        if is_raw_format:
+            rows = itertools.chain((header,), lines)
+        else:
+            col_indice = [0]
+            start_index = 0
+            for col in cls.TABLE_DELIMITER_PATTERN.findall(next(lines, "")):
+                start_index += len(col)
+                col_indice.append(start_index)
+            col_indice.pop(-1)
+            col_indice.append(None)
+            column_names = [
+                header[col_indice[i]:col_indice[i + 1]].strip().lower()
+                for i in range(len(col_indice) - 1)
+            ]
+            src_col = next(
+                (i for i, name in enumerate(column_names) if name in ("original src", "source", "src")),
+                None,
+            )
+            if src_col is None:
+                _LOGGER.warning("Unknown conntrack table header: %s", header)
+                return ConntrackActivity()
+            state_col = column_names.index("state") if "state" in column_names else None
+            src_slice = slice(col_indice[src_col], col_indice[src_col + 1])
+            state_slice = (
+                slice(col_indice[state_col], col_indice[state_col + 1])
+                if state_col is not None
+                else None
+            )
+            rows = lines
+        # counting the lines is cheap, so the total is exact even when the processing is truncated
+        line_count = table.count("\n") + 1 if table else 0
+        total_flows = line_count if is_raw_format else max(line_count - 2, 0)
+
+        processed_rows = 0
+        for line in rows:
+            if processed_rows >= max_rows:
+                _LOGGER.debug("Conntrack table truncated after %d rows", max_rows)
+                break
+            processed_rows += 1
+            if is_raw_format:
+                tokens = line.split()
+                src = next((token[4:] for token in tokens if token.startswith("src=")), None)
+                byte_counters = [int(token[6:]) for token in tokens if token.startswith("bytes=")]
+                flow_bytes = sum(byte_counters)
+                has_byte_counters = has_byte_counters or bool(byte_counters)
+                is_inactive = any(token in cls.CONNTRACK_INACTIVE_STATES for token in tokens[:4])
+            else:
+                src = cls._strip_port(line[src_slice].strip())
+                flow_bytes = 0
+                is_inactive = (
+                    state_slice is not None
+                    and line[state_slice].strip() in cls.CONNTRACK_INACTIVE_STATES
+                )
+            if not src or is_inactive:
+                continue
+            counter = activity.get(src, None)
+            if counter is None:
+                if len(activity) >= max_clients or src in rejected_ips:
+                    continue
+                if ip_filter is not None and not ip_filter(src):
+                    if len(rejected_ips) < max_clients:
+                        rejected_ips.add(src)
+                    continue
+                counter = activity[src] = [0, 0]
+            counter[0] += 1
+            counter[1] += flow_bytes
+
+        conntrack_activity = ConntrackActivity(
+            (
+                ip,
+                {"conntrack_flows": flows, "conntrack_bytes": flow_bytes}
+                if has_byte_counters
+                else {"conntrack_flows": flows},
+            )
+            for ip, (flows, flow_bytes) in activity.items()
+        )
+        conntrack_activity.total_flows = total_flows
+        return conntrack_activity
+
+    async def get_conntrack_activity(
+        self,
+        max_rows: int,
+        max_clients: int,
+        ip_filter: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["conntrack", "table", "ipv4"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+
+        return dict using source ip address as a key and the number of active flows and bytes as value,
+        the number of rows in the table is in its `total_flows`
+        """
+        conntrack_table_raw = await self._show(["conntrack", "table", "ipv4"])
+        conntrack_activity: ConntrackActivity = self._parse_conntrack_activity(
+            conntrack_table_raw,
+            max_rows=max_rows,
+            max_clients=max_clients,
+            ip_filter=ip_filter,
+        )
+        return conntrack_activity
+
+    @classmethod
+    def _parse_wireguard_handshake(cls, latest_handshake: str) -> Optional[int]:
+        """`1 minute, 20 seconds ago` -> 80, `Now` -> 0, None when there was no handshake"""
+        if latest_handshake.lower() == "now":
+            return 0
+        durations = cls.WIREGUARD_DURATION_PATTERN.findall(latest_handshake)
+        if not durations:
+            return None
+        return sum(
+            int(value) * cls.WIREGUARD_DURATION_SECONDS[unit] for value, unit in durations
+        )
+
+    @classmethod
+    def _parse_wireguard_summary(cls, summary: str, interface: str):
+        """
+        Process the `wg show` style summary of one interface, using peer public key as a key
+
+        ### Example input
+
+        ```
+        interface: wg0
+          public key: 0123456789abcdef0123456789abcdef0123456789a=
+          private key: (hidden)
+          listening port: 51820
+
+        peer: fedcba9876543210fedcba9876543210fedcba98765=
+          endpoint: 203.0.113.5:51820
+          allowed ips: 10.0.0.2/32
+          latest handshake: 1 minute, 20 seconds ago
+          transfer: 1.20 MiB received, 3.40 MiB sent
+        ```
+        """
+        peers: dict[str, dict[str, Any]] = {}
+        peer: Optional[dict[str, Any]] = None
+        for line in cls._iter_lines(summary):
+            field, separator, value = line.strip().partition(": ")
+            if not separator:
+                continue
+            if field == "peer":
+                peer = peers[value] = {
+                    "public_key": value,
+                    "interface": interface,
+                    "endpoint": None,
+                    "allowed_ips": [],
+                    "latest_handshake": None,
+                }
+            elif peer is None:
+                continue  # the interface section
+            elif field == "endpoint":
+                peer["endpoint"] = value
+            elif field == "allowed ips":
+                peer["allowed_ips"] = [
+                    allowed_ip.strip()
+                    for allowed_ip in value.split(",")
+                    if allowed_ip.strip() not in ("", "(none)")
+                ]
+            elif field == "latest handshake":
+                peer["latest_handshake"] = cls._parse_wireguard_handshake(value)
+        return peers
+
+    async def get_wireguard_peers(self, interfaces: list[str]):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["interfaces", "wireguard", "wg0", "summary"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+
+        The interfaces are requested concurrently,
+        return dict using peer public key as a key, `latest_handshake` is in seconds ago
+        """
+        import asyncio
+
+        summaries = await asyncio.gather(
+            *(self._show(["interfaces", "wireguard", interface, "summary"]) for interface in interfaces)
+        )
+        wireguard_peers: dict[
+            str,
+            dict[
+                Literal["public_key", "interface", "endpoint", "allowed_ips", "latest_handshake"],
+                Any,
+            ],
+        ] = {}
+        for interface, summary in zip(interfaces, summaries):
+            wireguard_peers.update(self._parse_wireguard_summary(summary, interface))
+        return wireguard_peers
+
+    async def _request(self, endpoint: str, op: str, path: list[str]) -> Any:
+        """Run `op` on `path` through `endpoint`, return the `data` of the response"""
+        payload = {
+            "data": json.dumps({"op": op, "path": path}),
+            "key": self.api_key,
+        }
+        headers = {}
+        try:
+            res = await self.make_request(endpoint, headers=headers, payload=payload)
+        except Exception as err:
+            raise VyOSApiError from err
+        if not res.ok:
+            raise VyOSApiError(res)
+        return (await res.json(content_type=None))["data"]
+
+    async def _show(self, path: list[str]) -> str:
+        """Run a `show` command, return its raw output"""
+        return await self._request("show", "show", path) or ""
+
+    @classmethod
+    def _parse_system_uptime(
+        cls, uptime: str, cpu_count: Optional[int] = None
+    ) -> dict[str, Optional[float]]:
+        """
+        Process `show system uptime`, the load averages are in percent of the cpu capacity
+
+        ```
+        Uptime: 2d 21h 18m 14s
+
+        Load averages:
+        1  minute:   0.8%
+        5  minutes:  0.5%
+        15 minutes:  0.4%
+        ```
+
+        or the `uptime` line of vyos 1.3 and lower, where the load averages are divided by `cpu_count`,
+        they are left unknown without it
+
+        ```
+         12:00:00 up 2 days,  3:04,  1 user,  load average: 0.00, 0.01, 0.05
+        ```
+        """
+        health: dict[str, Optional[float]] = {
+            "uptime": None,
+            "load_1m": None,
+            "load_5m": None,
+            "load_15m": None,
+        }
+        legacy_uptime = cls.UPTIME_LEGACY_PATTERN.search(uptime)
+        if legacy_uptime is not None:
+            days, hours, minutes, only_minutes = legacy_uptime.groups()
+            health["uptime"] = (
+                int(days or 0) * 86400
+                + int(hours or 0) * 3600
+                + int(minutes or only_minutes or 0) * 60
+            )
+        else:
+            uptime_line = next(
+                (line for line in cls._iter_lines(uptime) if line.startswith("Uptime:")), ""
+            )
+            durations = cls.UPTIME_PATTERN.findall(uptime_line)
+            if durations:
+                health["uptime"] = sum(
+                    int(value) * cls.UPTIME_SECONDS[unit] for value, unit in durations
+                )
+
+        legacy_load = cls.LOAD_LEGACY_PATTERN.search(uptime)
+        if legacy_load is not None:
+            if cpu_count:
+                for key, value in zip(("load_1m", "load_5m", "load_15m"), legacy_load.groups()):
+                    health[key] = round(float(value) / cpu_count * 100, 1)
+        else:
+            for minutes, value in cls.LOAD_PATTERN.findall(uptime):
+                if f"load_{minutes}m" in health:
+                    health[f"load_{minutes}m"] = float(value)
+        return health
+
+    @classmethod
+    def _parse_system_memory(cls, memory: str) -> dict[str, Optional[float]]:
+        """
+        Process `show system memory`, sizes are in MiB
+
+        ```
+        Total: 3.8 GB
+        Free:  2.9 GB
+        Used:  0.9 GB
+        ```
+        """
+        sizes: dict[str, float] = {}
+        for field, value, unit in cls.MEMORY_PATTERN.findall(memory):
+            sizes.setdefault(field.lower(), float(value) * cls.MEMORY_UNIT_MIB[unit.upper()])
+        total = sizes.get("total", None)
+        used = sizes.get("used", None)
+        if used is None and total is not None and "free" in sizes:
+            used = total - sizes["free"]
+        return {
+            "memory_total": round(total, 1) if total is not None else None,
+            "memory_used": round(used, 1) if used is not None else None,
+            "memory_used_percent": (
+                round(used / total * 100, 1) if total and used is not None else None
+            ),
+        }
+
+    async def _get_cpu_count(self) -> Optional[int]:
+        """
+        Get the number of cpu from `show system cpu summary` of vyos 1.3 and lower, None when unknown
+
+        ```
+        CPU(s): 4
+        CPU model(s): Intel(R) Atom(TM) CPU C2558 @ 2.40GHz
+        ```
+        """
+        try:
+            summary = await self._show(["system", "cpu", "summary"])
+        except VyOSApiError as err:
+            _LOGGER.debug("Unable to get the cpu count, the load averages are unknown: %r", err)
+            return None
+        cpu_count = self.CPU_COUNT_PATTERN.search(summary)
+        return int(cpu_count.group(1)) if cpu_count is not None else None
+
+    async def get_system_health(self):
+        """
+        API DOC:
+
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["system", "uptime"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+        curl -k --location --request POST 'https://192.168.1.1:11443/show' --form data='{"op": "show", "path": ["system", "memory"]}' --form key='MY-HTTPS-API-PLAINTEXT-KEY'
+
+        The commands and the conntrack table size from the config are requested concurrently,
+        return dict with `uptime` in seconds, `load_1m`, `load_5m`, `load_15m` in percent,
+        `memory_total`, `memory_used` in MiB, `memory_used_percent` and `conntrack_max`
+        """
+        import asyncio
+
+        uptime, memory, conntrack_config = await asyncio.gather(
+            self._show(["system", "uptime"]),
+            self._show(["system", "memory"]),
+            self.get_config(["system", "conntrack"]),
+            return_exceptions=True,
+        )
+        for result in (uptime, memory):
+            if isinstance(result, BaseException):
+                raise result
+        if isinstance(conntrack_config, BaseException) or not isinstance(conntrack_config, dict):
+            # the path is empty when the table size is not configured
+            conntrack_config = {}
+
+        if self._cpu_count is None and self.LOAD_LEGACY_PATTERN.search(uptime) is not None:
+            self._cpu_count = await self._get_cpu_count() or 0
+        health: dict[str, Optional[float]] = {
+            **self._parse_system_uptime(uptime, self._cpu_count),
+            **self._parse_system_memory(memory),
+        }
+        try:
+            health["conntrack_max"] = int(
+                conntrack_config.get("table-size", self.DEFAULT_CONNTRACK_TABLE_SIZE)
+            )
+        except (TypeError, ValueError):
+            health["conntrack_max"] = self.DEFAULT_CONNTRACK_TABLE_SIZE
+        return health
+
+    async def get_config(self, paths: list[str]):
+        raw_config: dict[str, Any] = await self._request("retrieve", "showConfig", paths)
+        return raw_config
@@ -0,0 +1,354 @@
+"""
+Record the raw responses of a router and replay them without the router
+
+A capture is a JSON lines file, a header line then one line per request:
+
+```
+{"version": 1, "created": 1700000000.0, "flags": {"ipv6": true, "conntrack": false}}
+{"t": 0.0, "elapsed": 0.042, "endpoint": "show", "op": "show", "path": ["arp"], "status": 200, "body": "{\\"success\\": true, ...}"}
+```
+
+`t` is the start of the request in seconds since the recording started and `elapsed` its latency.
+`flags` are the options the capture was recorded with, which decide the requests a replay could serve.
+The API key and the router url are never recorded. Mac addresses and hostnames are replaced by keyed hashes
+of the same length, so column widths survive and the same value maps to the same hash across responses,
+while a new random key per capture keeps the hashes from being reversed by guessing. IP addresses are kept,
+except the EUI-64 interface identifiers of IPv6 addresses, which embed a mac address and are rebuilt from its hash.
+"""
+import re
+import hmac
+import json
+import time
+import hashlib
+import secrets
+import ipaddress
+import threading
+import collections
+
+from typing import IO, Any, Optional
+
+CAPTURE_VERSION = 1
+
+MAC_PATTERN = re.compile(r"\b[0-9a-fA-F]{2}([:-])(?:[0-9a-fA-F]{2}\1){4}[0-9a-fA-F]{2}\b")
+# an IPv6 address candidate with the spaces padding it in a table, validated by `ipaddress`
+IPV6_PATTERN = re.compile(r"(?<![\w:])((?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{1,4})(?![\w:])( *)")
+HOSTNAME_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+HOSTNAME_KEPT_CHARACTERS = frozenset("-._ ")
+# the keys of these config nodes are hostnames or peer names
+NAMED_CONFIG_NODES = frozenset({"static-mapping", "peer"})
+TABLE_DELIMITER_RUN = re.compile(r"-+")
+TOKEN_PATTERN = re.compile(r"\S+")
+
+
+class Anonymizer:
+    """Replace mac addresses and hostnames by keyed hashes of the same length and shape."""
+
+    def __init__(self, key: Optional[bytes] = None) -> None:
+        self._key = key if key is not None else secrets.token_bytes(32)
+        self._cache: dict[str, str] = {}
+
+    def _digest(self, value: str, length: int) -> bytes:
+        """Return at least `length` bytes derived from the value."""
+        digest = b""
+        counter = 0
+        while len(digest) < length:
+            digest += hmac.new(
+                self._key, f"{counter}:{value}".encode("utf-8"), hashlib.sha256
+            ).digest()
+            counter += 1
+        return digest
+
+    def mac(self, mac: str) -> str:
+        """Hash a mac address, keeping its separators, letter case and the multicast and local bits."""
+        cached = self._cache.get(mac, None)
+        if cached is not None:
+            return cached
+        digits = [char for char in mac if char not in ":-"]
+        digest = self._digest(mac.lower(), 6)
+        first_octet = (digest[0] & 0xFC) | (int(mac[:2], 16) & 0x03)
+        hashed = "%02x" % first_octet + digest[1:6].hex()
+        if "".join(digits).isupper():
+            hashed = hashed.upper()
+        hashed_digits = iter(hashed)
+        result = "".join(char if char in ":-" else next(hashed_digits) for char in mac)
+        self._cache[mac] = result
+        return result
+
+    def hostname(self, hostname: str) -> str:
+        """Hash a hostname to lowercase letters and digits, keeping its length and its `-`, `.` and `_`."""
+        cached = self._cache.get(hostname, None)
+        if cached is not None:
+            return cached
+        digest = self._digest(hostname, len(hostname))
+        result = "".join(
+            char
+            if char in HOSTNAME_KEPT_CHARACTERS
+            else HOSTNAME_ALPHABET[digest[index] % len(HOSTNAME_ALPHABET)]
+            for index, char in enumerate(hostname)
+        )
+        self._cache[hostname] = result
+        return result
+
+    def ipv6(self, address: str) -> str:
+        """
+        Rebuild the EUI-64 interface identifier of an IPv6 address from the hashed mac address,
+        keeping the prefix, the letter case and the width of every group, other addresses are returned as is.
+        """
+        try:
+            parsed = ipaddress.IPv6Address(address)
+        except ValueError:
+            return address
+        interface_id = (int(parsed) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "big")
+        if interface_id[3:5] != b"\xff\xfe":
+            return address
+        # the universal/local bit of the mac address is inverted in the interface identifier
+        mac = bytes((interface_id[0] ^ 0x02,)) + interface_id[1:3] + interface_id[5:8]
+        hashed_mac = bytes.fromhex(self.mac(mac.hex(":")).replace(":", ""))
+        hashed_id = bytes((hashed_mac[0] ^ 0x02,)) + hashed_mac[1:3] + b"\xff\xfe" + hashed_mac[3:6]
+        groups = address.split(":")
+        if len(groups) > 4 and all(groups[-4:]):
+            result = ":".join(groups[:-4]) + ":" + ":".join(
+                "%0*x" % (len(group), int.from_bytes(hashed_id[index * 2:index * 2 + 2], "big"))
+                for index, group in enumerate(groups[-4:])
+            )
+        else:  # the interface identifier is partly compressed in `::`
+            result = str(
+                ipaddress.IPv6Address(
+                    (int(parsed) & ~0xFFFFFFFFFFFFFFFF) | int.from_bytes(hashed_id, "big")
+                )
+            )
+        return result.upper() if any(char.isupper() for char in address) else result
+
+    def addresses(self, text: str) -> str:
+        """Hash every mac address, including the ones embedded in IPv6 addresses."""
+        text = MAC_PATTERN.sub(lambda match: self.mac(match.group(0)), text)
+        if "ff:fe" not in text and "FF:FE" not in text:
+            return text
+        return IPV6_PATTERN.sub(self._ipv6_cell, text)
+
+    def _ipv6_cell(self, match: "re.Match[str]") -> str:
+        """Rewrite one IPv6 address, a longer address eats into the spaces after it so the next table columns stay in place."""
+        address, padding = match.group(1), match.group(2)
+        result = self.ipv6(address)
+        grown = len(result) - len(address)
+        if grown > 0 and padding:
+            padding = padding[:max(len(padding) - grown, 1)]
+        elif grown < 0 and padding:
+            padding += " " * -grown
+        return result + padding
+
+    def text(self, text: str) -> str:
+        """Anonymise a `show` output, every mac address and the cells of the `Hostname` table columns."""
+        text = self.addresses(text)
+        if "Hostname" not in text:
+            return text
+        lines = text.split("\n")
+        hostname_span: Optional[tuple[int, Optional[int]]] = None
+        for index, line in enumerate(lines):
+            if hostname_span is not None and not line.strip():
+                hostname_span = None  # end of the table
+            if hostname_span is not None:
+                start, stop = hostname_span
+                if not line.lstrip().startswith("-"):
+                    cell = line[start:stop] if stop is not None else line[start:]
+                    hashed_cell = TOKEN_PATTERN.sub(lambda match: self.hostname(match.group(0)), cell)
+                    lines[index] = line[:start] + hashed_cell + (line[stop:] if stop is not None else "")
+                    continue
+            if index + 1 < len(lines) and "Hostname" in line and lines[index + 1].lstrip().startswith("-"):
+                hostname_span = self._column_span(line, lines[index + 1], "Hostname")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _column_span(header: str, delimiter: str, column: str) -> Optional[tuple[int, Optional[int]]]:
+        """Return the `(start, stop)` of the column from the dashes of the delimiter line, stop is None for the last one."""
+        starts = [match.start() for match in TABLE_DELIMITER_RUN.finditer(delimiter)]
+        for position, start in enumerate(starts):
+            stop = starts[position + 1] if position + 1 < len(starts) else None
+            if (header[start:stop] if stop is not None else header[start:]).strip() == column:
+                return start, stop
+        return None
+
+    def config(self, node: Any, parent_key: Optional[str] = None) -> Any:
+        """Anonymise a `retrieve` config, every mac address and the names of the static mappings and peers."""
+        if isinstance(node, dict):
+            return {
+                (
+                    self.hostname(key)
+                    if parent_key in NAMED_CONFIG_NODES
+                    else self.addresses(key)
+                ): self.config(value, key)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [self.config(value, parent_key) for value in node]
+        if isinstance(node, str):
+            return self.addresses(node)
+        return node
+
+    def body(self, body: str) -> str:
+        """Anonymise the raw JSON body of a response, a body which isn't JSON only gets its mac addresses hashed."""
+        try:
+            envelope = json.loads(body)
+        except ValueError:
+            return self.addresses(body)
+        if isinstance(envelope, dict):
+            data = envelope.get("data", None)
+            if isinstance(data, str):
+                envelope["data"] = self.text(data)
+            elif data is not None:
+                envelope["data"] = self.config(data)
+        return json.dumps(envelope)
+
+
+class CaptureRecorder:
+    """
+    Append the anonymised responses to a capture file, one line per request
+
+    `record` only buffers the raw response, so it could be called from the event loop,
+    `flush` anonymises and writes the buffered responses, it is blocking and meant to run in an executor.
+    `flags` are the options of the recording, stored in the header for the replay.
+    """
+
+    def __init__(
+        self,
+        file: IO[str],
+        anonymizer: Optional[Anonymizer] = None,
+        flags: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self._file = file
+        self._anonymizer = anonymizer or Anonymizer()
+        self._started_at = time.monotonic()
+        self._pending: collections.deque[tuple[str, str, int, float, float, bytes]] = collections.deque()
+        self._write_lock = threading.Lock()
+        self._file.write(
+            json.dumps({"version": CAPTURE_VERSION, "created": time.time(), "flags": flags or {}}) + "\n"
+        )
+        self._file.flush()
+
+    @classmethod
+    def open(cls, path: str, flags: Optional[dict[str, Any]] = None) -> "CaptureRecorder":
+        """Create the capture file, this is blocking I/O."""
+        return cls(open(path, "w", encoding="utf-8"), flags=flags)
+
+    def record(
+        self, endpoint: str, data: str, status: int, started_at: float, elapsed: float, body: bytes
+    ) -> None:
+        """Buffer one response, `data` is the request `data` field, `started_at` a `time.monotonic` timestamp."""
+        self._pending.append((endpoint, data, status, started_at, elapsed, body))
+
+    def flush(self) -> None:
+        """Anonymise and write the buffered responses, this is blocking I/O."""
+        with self._write_lock:
+            if self._file.closed:
+                return
+            while self._pending:
+                endpoint, data, status, started_at, elapsed, body = self._pending.popleft()
+                request = json.loads(data)
+                self._file.write(
+                    json.dumps(
+                        {
+                            "t": round(started_at - self._started_at, 6),
+                            "elapsed": round(elapsed, 6),
+                            "endpoint": endpoint,
+                            "op": request.get("op", None),
+                            "path": request.get("path", []),
+                            "status": status,
+                            "body": self._anonymizer.body(body.decode("utf-8", "replace")),
+                        }
+                    )
+                    + "\n"
+                )
+            self._file.flush()
+
+    def close(self) -> None:
+        """Write the buffered responses and close the file, this is blocking I/O."""
+        self.flush()
+        with self._write_lock:
+            self._file.close()
+
+
+class ReplayResponse:
+    """The subset of an aiohttp response used by the client."""
+
+    def __init__(self, status: int, body: str) -> None:
+        self.status = status
+        self._body = body
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+    async def text(self) -> str:
+        return self._body
+
+    async def json(self, content_type: Optional[str] = None) -> Any:
+        # decoded on every call, so the replay pays the same decoding cost as a real response
+        return json.loads(self._body)
+
+
+class ReplaySession:
+    """
+    Serve the responses of a capture in place of an aiohttp session
+
+    The responses of each request are served in the recorded order and start over when exhausted,
+    so a capture of a few polls could be replayed any number of times.
+    `speed` 1 waits the recorded latency of every request, 2 half of it, and 0 doesn't wait at all.
+    A request missing from the capture gets a 404, replay with the recording `flags` to only make recorded requests.
+    """
+
+    def __init__(
+        self,
+        entries: list[dict[str, Any]],
+        speed: float = 0.0,
+        flags: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.speed = speed
+        self.flags: dict[str, Any] = flags or {}
+        self._responses: dict[tuple[str, str, str], list[dict[str, Any]]] = {}
+        self._positions: dict[tuple[str, str, str], int] = {}
+        for entry in entries:
+            key = self._key(entry["endpoint"], entry["op"], entry["path"])
+            self._responses.setdefault(key, []).append(entry)
+
+    @staticmethod
+    def _key(endpoint: str, op: Optional[str], path: list[str]) -> tuple[str, str, str]:
+        return endpoint, op or "", json.dumps(path)
+
+    @classmethod
+    def load(cls, path: str, speed: float = 0.0) -> "ReplaySession":
+        """Read a capture file, this is blocking I/O, raise ValueError when the file isn't a capture."""
+        with open(path, encoding="utf-8") as capture_file:
+            lines = iter(capture_file)
+            header = json.loads(next(lines, "{}"))
+            if header.get("version", None) != CAPTURE_VERSION:
+                raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture")
+            entries = [json.loads(line) for line in lines if line.strip()]
+        return cls(entries, speed, header.get("flags", None))
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._responses.values())
+
+    async def post(self, url: str, headers: dict, data: dict, **kwargs) -> ReplayResponse:
+        """Serve the next recorded response of the request."""
+        request = json.loads(data["data"])
+        endpoint = url.rstrip("/").rpartition("/")[2]
+        key = self._key(endpoint, request.get("op", None), request.get("path", []))
+        responses = self._responses.get(key, None)
+        if not responses:
+            return ReplayResponse(
+                404, json.dumps({"success": False, "data": None, "error": "Not in the capture"})
+            )
+        position = self._positions.get(key, 0)
+        self._positions[key] = (position + 1) % len(responses)
+        entry = responses[position]
+        if self.speed > 0:
+            import asyncio
+
+            await asyncio.sleep(entry["elapsed"] / self.speed)
+        return ReplayResponse(entry["status"], entry["body"])
+
+    async def close(self) -> None:
+        """Nothing to release, for compatibility with aiohttp sessions."""
@@ -0,0 +1,121 @@
+"""
+Include/exclude rules applied to the router records before they become devices
+"""
+import re
+import fnmatch
+import ipaddress
+
+from typing import Mapping, Optional, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+RULE_KINDS = ("net", "pool", "iface", "mac")
+
+
+class _CompiledRules:
+    """Rules of one list, grouped by kind."""
+
+    __slots__ = ("networks", "network_versions", "pools", "interfaces", "mac_pattern")
+
+    def __init__(self, rules: str) -> None:
+        self.networks: list[IPNetwork] = []
+        self.pools: set[str] = set()
+        self.interfaces: set[str] = set()
+        mac_globs: list[str] = []
+        for rule in rules.split(","):
+            rule = rule.strip()
+            if not rule:
+                continue
+            kind, separator, value = rule.partition(":")
+            kind = kind.strip().lower()
+            value = value.strip()
+            if not separator or not value or kind not in RULE_KINDS:
+                raise ValueError(
+                    f"Invalid filter rule `{rule}`, expected one of {', '.join(kind + ':...' for kind in RULE_KINDS)}"
+                )
+            if kind == "net":
+                self.networks.append(ipaddress.ip_network(value, strict=False))
+            elif kind == "pool":
+                self.pools.add(value)
+            elif kind == "iface":
+                self.interfaces.add(value)
+            else:
+                value = value.lower().replace("-", ":")
+                # a mac without glob character is a prefix
+                mac_globs.append(value if any(char in value for char in "*?[") else value + "*")
+        self.network_versions = frozenset(network.version for network in self.networks)
+        self.mac_pattern: Optional[re.Pattern] = (
+            re.compile("|".join(fnmatch.translate(mac_glob) for mac_glob in mac_globs))
+            if mac_globs
+            else None
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.networks or self.pools or self.interfaces or self.mac_pattern)
+
+    def applicable(self, record: Mapping[str, object], address: Optional[IPAddress]) -> bool:
+        """Whether at least one rule targets a field the record has, `net:` rules only target their address family."""
+        return bool(
+            (address is not None and address.version in self.network_versions)
+            or (self.pools and record.get("pool", None))
+            or (self.interfaces and record.get("interface", None))
+            or (self.mac_pattern is not None and record.get("mac", None))
+        )
+
+    def match(self, record: Mapping[str, object], address: Optional[IPAddress]) -> bool:
+        """Whether any rule matches the record, `address` is its parsed ip."""
+        if self.pools and record.get("pool", None) in self.pools:
+            return True
+        if self.interfaces and record.get("interface", None) in self.interfaces:
+            return True
+        mac = record.get("mac", None)
+        if self.mac_pattern is not None and mac and self.mac_pattern.match(mac.lower()):
+            return True
+        if address is not None and address.version in self.network_versions:
+            return any(address in network for network in self.networks)
+        return False
+
+
+class DeviceFilter:
+    """
+    Include and exclude rules, compiled once from comma separated `kind:value`
+
+    - `net:192.168.10.0/24` ip in the network
+    - `pool:Guest` DHCP pool or shared-network-name
+    - `iface:eth2` interface
+    - `mac:aa:bb:cc` mac prefix, or glob like `mac:aa:bb:cc:*:*:0?`
+
+    A record is dropped when any exclude rule matches. When there are include rules,
+    a record is kept only if one of them matches, include rules targeting a field the record doesn't have are ignored,
+    for instance `pool:` rules don't drop the ARP entries which have no pool, and IPv4 `net:` rules don't drop
+    the IPv6 neighbors, which are only joined to the devices kept from the IPv4 sources.
+    """
+
+    def __init__(self, include: str = "", exclude: str = "") -> None:
+        self._include = _CompiledRules(include)
+        self._exclude = _CompiledRules(exclude)
+        # the ip is only parsed when a `net:` rule needs it
+        self._networks = bool(self._include.networks or self._exclude.networks)
+
+    def __bool__(self) -> bool:
+        return bool(self._include or self._exclude)
+
+    def __call__(self, record: Mapping[str, object]) -> bool:
+        """Return true if the record, holding any of `ip`, `mac`, `pool` and `interface`, is kept."""
+        address = self._address(record) if self._networks else None
+        if self._exclude and self._exclude.match(record, address):
+            return False
+        if self._include and self._include.applicable(record, address):
+            return self._include.match(record, address)
+        return True
+
+    @staticmethod
+    def _address(record: Mapping[str, object]) -> Optional[IPAddress]:
+        ip = record.get("ip", None)
+        if not ip:
+            return None
+        try:
+            return ipaddress.ip_address(ip)
+        except ValueError:
+            return None
@@ -0,0 +1,293 @@
+"""
+Merge the router data sources into one device list, this module doesn't depend on Home Assistant
+"""
+import ipaddress
+
+from .util import deep_update
+from .filters import DeviceFilter, IPNetwork
+from .neighbor import NeighborIndex
+
+from typing import Any, Callable, Iterable, Literal, Mapping, MutableMapping, Optional, Union
+from functools import reduce
+
+# a peer with a more recent handshake is present, wireguard re-handshakes every 2 minutes while active
+WIREGUARD_HANDSHAKE_TIMEOUT = 180
+# wireguard peers are tracked by public key, the prefix keeps them apart from the mac addresses
+WIREGUARD_KEY_PREFIX = "wireguard:"
+
+
+class SubnetIndex:
+    """
+    DHCP subnets of the router with their shared network and interface, to locate the leases and static mappings
+
+    The interface of a subnet is its `interface` config node (VyOS 1.5), or else the router interface
+    having an address in the subnet, a relayed subnet has no interface.
+    """
+
+    __slots__ = ("_subnets", "_located")
+
+    def __init__(self, subnets: Iterable[tuple[IPNetwork, str, Optional[str]]]) -> None:
+        self._subnets = list(subnets)
+        # leases keep their ip, so the same few ip addresses are located on every poll
+        self._located: dict[tuple[Optional[str], Optional[str]], Optional[tuple[str, str, Optional[str]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._subnets)
+
+    @classmethod
+    def build(
+        cls,
+        dhcp_server_config: Mapping[str, Any],
+        interface_addresses: Optional[Mapping[str, list[str]]] = None,
+    ) -> "SubnetIndex":
+        """
+        Build the index from the `service dhcp-server shared-network-name` config
+        and the addresses of the router interfaces, as returned by `VyOSApi.get_interface_addresses`
+        """
+        interface_networks: list[tuple[IPNetwork, str]] = []
+        for interface, addresses in (interface_addresses or {}).items():
+            for address in addresses:
+                try:
+                    interface_networks.append((ipaddress.ip_interface(address).network, interface))
+                except ValueError:
+                    continue
+
+        subnets: list[tuple[IPNetwork, str, Optional[str]]] = []
+        for shared_network_name, shared_network_name_dict in (
+            dhcp_server_config.get("shared-network-name", None) or {}
+        ).items():
+            for subnet_name, subnet_dict in (shared_network_name_dict.get("subnet", None) or {}).items():
+                try:
+                    network = ipaddress.ip_network(subnet_name, strict=False)
+                except ValueError:
+                    continue
+                interface = subnet_dict.get("interface", None)
+                if not isinstance(interface, str):
+                    interface = next(
+                        (
+                            interface_name
+                            for interface_network, interface_name in interface_networks
+                            if interface_network.version == network.version
+                            and interface_network.overlaps(network)
+                        ),
+                        None,
+                    )
+                subnets.append((network, shared_network_name, interface))
+        return cls(subnets)
+
+    def locate(self, ip: Optional[str], pool: Optional[str] = None) -> Optional[tuple[str, str, Optional[str]]]:
+        """
+        Return the `(subnet, shared network name, interface)` of the ip address,
+        or of the pool when the ip is unknown and the pool has a single subnet, None when not found
+        """
+        key = (ip, pool)
+        if key in self._located:
+            return self._located[key]
+        located = None
+        address = None
+        if ip:
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                pass
+        if address is not None:
+            located = next(
+                (
+                    (str(network), shared_network_name, interface)
+                    for network, shared_network_name, interface in self._subnets
+                    if address in network
+                ),
+                None,
+            )
+        elif pool:
+            pool_subnets = [
+                (str(network), shared_network_name, interface)
+                for network, shared_network_name, interface in self._subnets
+                if shared_network_name == pool
+            ]
+            located = pool_subnets[0] if len(pool_subnets) == 1 else None
+        self._located[key] = located
+        return located
+
+
+def locate_record(record: MutableMapping[str, Any], subnet_index: SubnetIndex) -> None:
+    """Add the `subnet`, and the `pool` and `interface` when missing, of a lease or static mapping found in the index."""
+    located = subnet_index.locate(record.get("ip", None) or None, record.get("pool", None) or None)
+    if located is None:
+        return
+    record["subnet"], shared_network_name, interface = located
+    if not record.get("pool", None):
+        record["pool"] = shared_network_name
+    if interface is not None:
+        record["interface"] = interface
+
+
+def dhcp_lease_filter(
+    subnet_index: SubnetIndex, device_filter: Optional[DeviceFilter] = None
+) -> Callable[[dict[str, str]], bool]:
+    """
+    Return the `record_filter` of `VyOSApi.get_dhcp_lease`, locating every lease in its subnet before applying the rules,
+    so the leases dropped by the rules are never collected
+    """
+
+    def filter_lease(lease: dict[str, str]) -> bool:
+        locate_record(lease, subnet_index)
+        return device_filter is None or device_filter(lease)
+
+    return filter_lease
+
+
+def parse_static_mapping(
+    static_mapping_config: Mapping[str, Any],
+    conf_mac_name: Literal["mac", "mac-address"],
+    device_filter: Optional[DeviceFilter] = None,
+    subnet_index: Optional[SubnetIndex] = None,
+) -> dict[str, dict[Literal["mac", "ip", "hostname", "pool", "subnet", "interface"], str]]:
+    """
+    Get static mapping from the `service dhcp-server shared-network-name` config, using mac address as a key.
+
+    With `subnet_index`, the mappings get the interface of their subnet before `device_filter` is applied.
+    """
+    static_mapping_host_detail: dict[
+        str, dict[Literal["mac", "ip", "hostname", "pool", "subnet"], str]
+    ] = {}
+
+    shared_network_name_dict: dict[str, dict[str, Any]]
+    subnet_dict: dict[str, dict[str, Any]]
+    mapping_detail: dict[
+        Literal["ip-address", "mac", "static-mapping-parameters"],
+        Union[str, list[str]],
+    ]
+    # shared_network_name = Lan
+    # subnet_name = 192.168.1.0/24
+    for shared_network_name, shared_network_name_dict in static_mapping_config[
+        "shared-network-name"
+    ].items():
+        for subnet_name, subnet_dict in shared_network_name_dict["subnet"].items():
+            if "static-mapping" not in subnet_dict:
+                # This subnet doesn't have any static-mapping definition
+                continue
+            for hostname, mapping_detail in subnet_dict["static-mapping"].items():
+                if conf_mac_name not in mapping_detail:
+                    continue
+                mac = mapping_detail[conf_mac_name]
+                mapping = {
+                    "mac": mac,
+                    "ip": mapping_detail.get("ip-address", None),
+                    "hostname": hostname,
+                    "pool": shared_network_name,
+                    "subnet": subnet_name,
+                }
+                if subnet_index is not None:
+                    locate_record(mapping, subnet_index)
+                if device_filter is not None and not device_filter(mapping):
+                    continue
+                static_mapping_host_detail[mac] = mapping
+    return static_mapping_host_detail
+
+
+def parse_wireguard_peer_names(wireguard_config: Mapping[str, Any]) -> dict[str, str]:
+    """Get the peer names from the `interfaces wireguard` config, using public key as a key."""
+    peer_names: dict[str, str] = {}
+    for interface_config in wireguard_config.values():
+        for peer_name, peer_config in interface_config.get("peer", {}).items():
+            if "public-key" in peer_config:
+                peer_names[peer_config["public-key"]] = peer_name
+    return peer_names
+
+
+def merge_devices(
+    static_mapping: Mapping[str, Mapping[str, Any]],
+    dhcp_lease: Mapping[str, Mapping[str, Any]],
+    arp_table: Mapping[str, Mapping[str, str]],
+    ndp_table: Optional[Mapping[str, Mapping[str, str]]] = None,
+    conntrack_activity: Optional[Mapping[str, Mapping[str, int]]] = None,
+    wireguard_peers: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    device_filter: Optional[DeviceFilter] = None,
+) -> tuple[dict[str, dict[str, Any]], set[str]]:
+    """
+    Merge the data sources into device params using mac address as a key, or `wireguard:<public key>` for the peers
+
+    The static mappings and leases are expected already located and filtered while parsed,
+    by `parse_static_mapping` and `dhcp_lease_filter` given the `SubnetIndex`, `device_filter` only applies to the peers.
+    The sources are not modified, so they could be reused on the next cycles.
+    return the device params and the set of keys seen active
+    """
+    ndp_table = ndp_table or {}
+
+    # get from static mapping to get the hostname and mac
+    # get from dhcp lease to get the hostname
+    device_list: dict[str, dict[str, Any]] = reduce(
+        deep_update,
+        (
+            {mac: dict(detail) for mac, detail in static_mapping.items()},
+            dhcp_lease,
+        ),
+    )
+
+    # key of arp and ndp tables is ip, in those tables many ip could have the same mac address #1
+    # so both are indexed by mac address in a single pass
+    neighbor_index = NeighborIndex.build(arp_table, ndp_table)
+    # Update device_list to add ip address and neighbor state, if possible
+    for mac, params in device_list.items():
+        original_ip = params.get("ip", None)
+        neighbor = neighbor_index.get(mac, None)
+        if neighbor is None:
+            params["ip"] = original_ip
+            continue
+        params["ip"] = original_ip or neighbor.ip
+        params["arp_state"] = neighbor.state
+        params["interface"] = neighbor.interface
+        if neighbor.ipv6:
+            params["ipv6_addresses"] = neighbor.ipv6
+
+    # key of conntrack activity is the source ip, join it to the device by ip
+    conntrack_active_ip: set[str] = set()
+    if conntrack_activity is not None:
+        for params in device_list.values():
+            activity = conntrack_activity.get(params.get("ip", None), None)
+            if activity is None:
+                continue
+            params.update(activity)
+            if activity["conntrack_flows"] > 0:
+                conntrack_active_ip.add(params["ip"])
+
+    # wireguard peers are keyed by public key and present when the latest handshake is recent
+    wireguard_active_key: set[str] = set()
+    if wireguard_peers is not None:
+        for public_key, peer in wireguard_peers.items():
+            key = WIREGUARD_KEY_PREFIX + public_key
+            peer_ip = peer["allowed_ips"][0].partition("/")[0] if peer["allowed_ips"] else None
+            if device_filter is not None and not device_filter(
+                {"ip": peer_ip, "interface": peer["interface"]}
+            ):
+                continue
+            device_list[key] = {
+                "ip": peer_ip,
+                "interface": peer["interface"],
+                "public_key": public_key,
+                "endpoint": peer["endpoint"],
+                "latest_handshake": peer["latest_handshake"],
+            }
+            if peer.get("name", None):
+                device_list[key]["hostname"] = peer["name"]
+            if (
+                peer["latest_handshake"] is not None
+                and peer["latest_handshake"] <= WIREGUARD_HANDSHAKE_TIMEOUT
+            ):
+                wireguard_active_key.add(key)
+
+    active_keys: set[str] = set()
+    for key, params in device_list.items():
+        ip = params.get("ip", None)
+        # the neighbor tables only hold entries in a presence state
+        if (
+            key in neighbor_index
+            or ip in arp_table
+            or ip in ndp_table
+            or ip in conntrack_active_ip
+            or key in wireguard_active_key
+        ):
+            active_keys.add(key)
+
+    return device_list, active_keys
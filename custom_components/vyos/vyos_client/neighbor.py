@@ -0,0 +1,85 @@
+"""
+Index the IPv4 ARP and IPv6 NDP neighbors by mac address
+"""
+from typing import Iterable, Mapping, Optional
+
+# higher is a stronger proof of reachability, `C` and `M` are the complete and permanent flags of vyos 1.3 and lower
+NEIGHBOR_STATE_STRENGTH: Mapping[str, int] = {
+    "REACHABLE": 4,
+    "C": 4,
+    "M": 4,
+    "P": 4,
+    "DELAY": 3,
+    "PROBE": 2,
+    "STALE": 1,
+}
+
+
+class NeighborEntry:
+    """All the addresses of one mac address, with the strongest state among them."""
+
+    __slots__ = ("mac", "ipv4", "ipv6", "state", "interface")
+
+    def __init__(self, mac: str) -> None:
+        self.mac = mac
+        self.ipv4: list[str] = []
+        self.ipv6: list[str] = []
+        self.state: Optional[str] = None
+        self.interface: Optional[str] = None
+
+    @property
+    def strength(self) -> int:
+        """Return the strength of the strongest state."""
+        return NEIGHBOR_STATE_STRENGTH.get(self.state, 0)
+
+    @property
+    def ip(self) -> Optional[str]:
+        """Return the primary ip address, IPv4 is preferred."""
+        if self.ipv4:
+            return self.ipv4[0]
+        if self.ipv6:
+            return self.ipv6[0]
+        return None
+
+    def add(self, ip: str, state: Optional[str], interface: Optional[str], is_ipv6: bool) -> None:
+        """Add one neighbor address of this mac address."""
+        (self.ipv6 if is_ipv6 else self.ipv4).append(ip)
+        if self.state is None or NEIGHBOR_STATE_STRENGTH.get(state, 0) > self.strength:
+            self.state = state
+            self.interface = interface
+
+
+class NeighborIndex(dict[str, NeighborEntry]):
+    """Neighbor entries using mac address as a key."""
+
+    @classmethod
+    def build(
+        cls,
+        arp_table: Mapping[str, Mapping[str, str]],
+        ndp_table: Optional[Mapping[str, Mapping[str, str]]] = None,
+    ) -> "NeighborIndex":
+        """
+        Build the index in a single pass over both tables,
+        the tables use ip as a key and hold `ip`, `mac`, `interface` and `arp_state`
+        """
+        index = cls()
+        tables: Iterable[tuple[Mapping[str, Mapping[str, str]], bool]] = (
+            (arp_table, False),
+            (ndp_table or {}, True),
+        )
+        for table, is_ipv6 in tables:
+            for table_entry in table.values():
+                mac = table_entry.get("mac", None)
+                ip = table_entry.get("ip", None)
+                if not mac or not ip:
+                    continue
+                entry = index.get(mac, None)
+                if entry is None:
+                    entry = index[mac] = NeighborEntry(mac)
+                entry.add(
+                    ip,
+                    table_entry.get("arp_state", None),
+                    table_entry.get("interface", None),
+                    is_ipv6,
+                )
+        return index
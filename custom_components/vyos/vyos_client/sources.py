@@ -0,0 +1,52 @@
+"""
+Fetch the data sources built from several requests, shared by the integration and the poll CLI
+"""
+from .api import VyOSApi, VyOSApiError
+from .filters import DeviceFilter
+from .merge import SubnetIndex, parse_static_mapping, parse_wireguard_peer_names
+
+from typing import Any, Literal, Mapping, Optional
+
+DHCP_SERVER_CONFIG_PATH = ["service", "dhcp-server", "shared-network-name"]
+WIREGUARD_CONFIG_PATH = ["interfaces", "wireguard"]
+
+
+async def fetch_static_mapping(
+    api: VyOSApi,
+    conf_mac_name: Literal["mac", "mac-address"],
+    interface_addresses: Optional[Mapping[str, list[str]]] = None,
+    device_filter: Optional[DeviceFilter] = None,
+) -> tuple[dict[str, dict[str, str]], SubnetIndex]:
+    """
+    Get the static mappings from the dhcp-server config, using mac address as a key,
+    with the `SubnetIndex` of the config and the interface addresses, which located them before `device_filter`
+    """
+    dhcp_server_config = await api.get_config(DHCP_SERVER_CONFIG_PATH)
+    subnet_index = SubnetIndex.build(dhcp_server_config, interface_addresses)
+    return (
+        parse_static_mapping(dhcp_server_config, conf_mac_name, device_filter, subnet_index),
+        subnet_index,
+    )
+
+
+async def fetch_wireguard_config(api: VyOSApi) -> dict[str, Any]:
+    """Get the `interfaces wireguard` config, empty when no WireGuard interface is configured."""
+    try:
+        return await api.get_config(WIREGUARD_CONFIG_PATH) or {}
+    except VyOSApiError:
+        # the config path doesn't exist when no wireguard interface is configured
+        return {}
+
+
+async def fetch_wireguard_peers(
+    api: VyOSApi, wireguard_config: Mapping[str, Any]
+) -> dict[str, dict[str, Any]]:
+    """
+    Get the peers of every WireGuard interface of the config, using public key as a key,
+    named after their config node, one concurrent request per interface
+    """
+    peer_names = parse_wireguard_peer_names(wireguard_config)
+    wireguard_peers = await api.get_wireguard_peers(list(wireguard_config))
+    for public_key, peer in wireguard_peers.items():
+        peer["name"] = peer_names.get(public_key, None)
+    return wireguard_peers
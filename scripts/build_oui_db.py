@@ -0,0 +1,121 @@
+"""
+Build `custom_components/vyos/oui.bin` from the IEEE registries
+
+Accept both the csv (`oui.csv`, `mam.csv`, `oui36.csv`) and the text (`oui.txt`, `mam.txt`, `oui36.txt`, `iab.txt`)
+registries from https://standards-oui.ieee.org/, and the Wireshark `manuf` file which holds all of them.
+The database must hold the 24 (MA-L), 28 (MA-M) and 36 (MA-S, IAB) bits prefixes, the build fails otherwise.
+
+```bash
+python scripts/build_oui_db.py oui.csv mam.csv oui36.csv iab.csv
+python scripts/build_oui_db.py manuf oui.txt iab.txt
+```
+"""
+import os
+import csv
+import sys
+import argparse
+import importlib.util
+
+from typing import Iterator
+
+COMPONENT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "vyos")
+)
+
+# load the module alone, the integration package needs Home Assistant
+_spec = importlib.util.spec_from_file_location("vyos_oui", os.path.join(COMPONENT_DIR, "oui.py"))
+oui = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(oui)
+
+
+def iter_csv_registry(path: str) -> Iterator[tuple[int, int, str]]:
+    """`Registry,Assignment,Organization Name,Organization Address`, the assignment holds 6, 7 or 9 hex digits"""
+    with open(path, newline="", encoding="utf-8") as registry_file:
+        for row in csv.DictReader(registry_file):
+            assignment = row["Assignment"].strip()
+            yield int(assignment, 16), len(assignment) * 4, row["Organization Name"].strip()
+
+
+def iter_text_registry(path: str) -> Iterator[tuple[int, int, str]]:
+    """
+    ```
+    40-D8-55                      (hex)                         Avant Technologies
+    0D7000-0D7FFF                 (base 16)                     Avant Technologies
+    ```
+
+    The `(hex)` line holds the first 24 bits, for MA-M, MA-S and IAB the `(base 16)` range holds the rest
+    """
+    hex_prefix = None
+    with open(path, encoding="utf-8", errors="replace") as registry_file:
+        for line in registry_file:
+            if "(hex)" in line:
+                hex_prefix = line.split("(hex)")[0].strip().replace("-", "")
+            elif "(base 16)" in line and hex_prefix is not None:
+                assignment, vendor = (part.strip() for part in line.split("(base 16)", 1))
+                if "-" in assignment:
+                    low, high = assignment.split("-")
+                    common = os.path.commonprefix([low, high])
+                    prefix = hex_prefix + common
+                else:
+                    prefix = assignment
+                yield int(prefix, 16), len(prefix) * 4, vendor
+                hex_prefix = None
+
+
+def iter_manuf_registry(path: str) -> Iterator[tuple[int, int, str]]:
+    """
+    ```
+    00:01:06	TewsDate	Tews Datentechnik GmbH
+    00:55:DA:10:00:00/28	KoolPOS	KoolPOS Inc.
+    ```
+
+    Only the prefixes of the IEEE registries are kept, the well-known addresses of other lengths are skipped
+    """
+    with open(path, encoding="utf-8", errors="replace") as registry_file:
+        for line in registry_file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 2:
+                continue
+            address, _slash, bits_text = fields[0].strip().partition("/")
+            digits = address.replace(":", "").replace("-", "")
+            bits = int(bits_text) if bits_text else len(digits) * 4
+            if bits not in oui.OUIDatabase.PREFIX_BITS:
+                continue
+            vendor = (fields[2] if len(fields) > 2 and fields[2].strip() else fields[1]).strip()
+            yield int(digits, 16) >> (len(digits) * 4 - bits), bits, vendor
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("registries", nargs="+", help="IEEE registry files, the most specific last")
+    parser.add_argument("-o", "--output", default=oui.OUI_DB_PATH)
+    args = parser.parse_args(argv)
+
+    entries: list[tuple[int, int, str]] = []
+    for path in args.registries:
+        if path.endswith(".csv"):
+            iter_registry = iter_csv_registry
+        elif os.path.basename(path).startswith("manuf"):
+            iter_registry = iter_manuf_registry
+        else:
+            iter_registry = iter_text_registry
+        entries.extend(iter_registry(path))
+
+    missing_bits = set(oui.OUIDatabase.PREFIX_BITS) - {bits for _prefix, bits, _vendor in entries}
+    if missing_bits:
+        parser.error(
+            f"no {', '.join(str(bits) for bits in sorted(missing_bits))} bits prefix in the registries, "
+            "the database needs MA-L, MA-M and MA-S"
+        )
+
+    content = oui.OUIDatabase.build(entries)
+    with open(args.output, "wb") as output_file:
+        output_file.write(content)
+    print(f"{len(entries)} entries, {len(content)} bytes written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
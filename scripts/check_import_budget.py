@@ -0,0 +1,96 @@
+"""
+Check that the client package imports fast and without Home Assistant, requests or aiohttp
+
+Each import is measured in a fresh interpreter, the best of several runs is compared to the budget.
+The slowest modules reported by `python -X importtime` are printed when the budget is exceeded.
+
+```bash
+python scripts/check_import_budget.py
+python scripts/check_import_budget.py --budget-ms 30 --runs 10
+```
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from typing import Optional
+
+COMPONENT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "vyos")
+)
+
+# every public name is resolved, so all the modules of the package are imported
+IMPORT_STATEMENT = "import vyos_client; [getattr(vyos_client, name) for name in vyos_client.__all__]"
+FORBIDDEN_MODULES = ("homeassistant", "requests", "aiohttp")
+
+MEASURE_CODE = f"""
+import sys, time, json
+sys.path.insert(0, {COMPONENT_DIR!r})
+start = time.perf_counter()
+{IMPORT_STATEMENT}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "forbidden": sorted(name for name in sys.modules if name.split(".")[0] in {FORBIDDEN_MODULES!r}),
+}}))
+"""
+
+
+def measure_once() -> dict:
+    """Import the package in a fresh interpreter, return the import time and the forbidden modules imported."""
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_CODE], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def slowest_imports(count: int = 10) -> list[tuple[int, str]]:
+    """Return the slowest modules by cumulative import time in microseconds."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; sys.path.insert(0, {COMPONENT_DIR!r}); {IMPORT_STATEMENT}",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: list[tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative_us), module))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="import time budget in milliseconds")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters, the best run counts")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    best_ms = min(run["elapsed"] for run in runs) * 1000
+    forbidden = sorted({name for run in runs for name in run["forbidden"]})
+
+    ok = True
+    print(f"import vyos_client: {best_ms:.1f} ms (budget {args.budget_ms:.1f} ms, best of {args.runs})")
+    if forbidden:
+        ok = False
+        print(f"forbidden modules imported: {', '.join(forbidden)}")
+    if best_ms > args.budget_ms:
+        ok = False
+        print("slowest imports (cumulative us):")
+        for cumulative_us, module in slowest_imports():
+            print(f"  {cumulative_us:>8}  {module}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
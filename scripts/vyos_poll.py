@@ -0,0 +1,306 @@
+"""
+Poll a VyOS router without Home Assistant and print the merged device table with timings
+
+Work with a real router or with any simulator serving the same HTTP API.
+Print the latency of every request, the parse time of every source and the merge time.
+
+```bash
+python scripts/vyos_poll.py https://192.168.1.1:11443 --key MY-HTTPS-API-PLAINTEXT-KEY
+python scripts/vyos_poll.py https://192.168.1.1:11443 --key MY-HTTPS-API-PLAINTEXT-KEY --count 10 --interval 5 --json
+```
+
+Record the responses of a router to an anonymised capture, then replay it offline at maximum or recorded speed:
+
+```bash
+python scripts/vyos_poll.py https://192.168.1.1:11443 --key MY-HTTPS-API-PLAINTEXT-KEY --count 5 --record router.jsonl
+python scripts/vyos_poll.py --replay router.jsonl --count 100 --interval 0
+python scripts/vyos_poll.py --replay router.jsonl --replay-speed 1
+```
+
+A replay uses the `--dhcp-server-version`, `--no-ipv6`, `--conntrack` and `--wireguard` of the recording.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextvars
+
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+COMPONENT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "vyos")
+)
+# the client package doesn't depend on Home Assistant, it is imported without the integration
+sys.path.insert(0, COMPONENT_DIR)
+
+import vyos_client  # noqa: E402
+
+# the options deciding which requests a poll makes and how their responses are parsed,
+# stored in the capture header and applied on replay, so a replay only makes the recorded requests
+CAPTURE_FLAGS = ("dhcp_server_version", "ipv6", "conntrack", "wireguard")
+
+# the source being fetched by the current task, so the request timings could be attributed to it
+_current_source: contextvars.ContextVar[str] = contextvars.ContextVar("current_source", default="")
+
+
+class TimedVyOSApi(vyos_client.VyOSApi):
+    """VyOSApi recording the latency of every request, including the download of the response body."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.request_timings: list[dict[str, Any]] = []
+
+    async def make_request(self, path, headers: dict, payload: dict):
+        start = time.perf_counter()
+        res = await super().make_request(path, headers, payload)
+        await res.read()
+        self.request_timings.append(
+            {
+                "source": _current_source.get(),
+                "path": " ".join(json.loads(payload["data"])["path"]),
+                "latency": time.perf_counter() - start,
+            }
+        )
+        return res
+
+
+async def timed_source(
+    api: TimedVyOSApi, source: str, fetch: Callable[[], Awaitable[Any]]
+) -> tuple[str, Any, float]:
+    """Fetch one source, return its name, result and total time."""
+    _current_source.set(source)
+    start = time.perf_counter()
+    result = await fetch()
+    return source, result, time.perf_counter() - start
+
+
+async def poll_once(api: TimedVyOSApi, args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Fetch the sources, merge them and return the devices with the timings,
+    the interfaces then the static mappings are fetched first as the dhcp subnets they index
+    locate and filter the leases and static mappings while parsed, as in the integration
+    """
+    device_filter = vyos_client.DeviceFilter(args.include, args.exclude)
+    device_filter = device_filter if device_filter else None
+    conf_mac_name = "mac-address" if args.dhcp_server_version <= 7 else "mac"
+
+    results: dict[str, Any] = {}
+    subnet_index = vyos_client.SubnetIndex(())
+
+    async def fetch_static_mapping():
+        nonlocal subnet_index
+        static_mapping, subnet_index = await vyos_client.fetch_static_mapping(
+            api, conf_mac_name, results["interfaces"], device_filter
+        )
+        return static_mapping
+
+    async def fetch_wireguard_peers():
+        return await vyos_client.fetch_wireguard_peers(
+            api, await vyos_client.fetch_wireguard_config(api)
+        )
+
+    sources: dict[str, Callable[[], Awaitable[Any]]] = {
+        "arp": lambda: api.get_present_arp_clients(args.interfaces, record_filter=device_filter),
+        "dhcp_lease": lambda: api.get_dhcp_lease(
+            record_filter=vyos_client.dhcp_lease_filter(subnet_index, device_filter)
+        ),
+        "static_mapping": fetch_static_mapping,
+        "interfaces": api.get_interface_addresses,
+    }
+    if args.ipv6:
+        sources["ndp"] = lambda: api.get_present_ipv6_neighbors(
+            args.interfaces, record_filter=device_filter
+        )
+    if args.conntrack:
+        sources["conntrack"] = lambda: api.get_conntrack_activity(
+            max_rows=args.conntrack_max_rows,
+            max_clients=args.conntrack_max_clients,
+            ip_filter=(lambda ip: device_filter({"ip": ip})) if device_filter else None,
+        )
+    if args.wireguard:
+        sources["wireguard"] = fetch_wireguard_peers
+
+    api.request_timings = []
+    poll_start = time.perf_counter()
+    fetched: list[tuple[str, Any, float]] = []
+    for phase in (
+        ["interfaces"],
+        ["static_mapping"],
+        [source for source in sources if source not in ("interfaces", "static_mapping")],
+    ):
+        phase_fetched = await asyncio.gather(
+            *(timed_source(api, source, sources[source]) for source in phase)
+        )
+        fetched.extend(phase_fetched)
+        results.update((source, result) for source, result, _total in phase_fetched)
+
+    source_timings: dict[str, dict[str, float]] = {}
+    for source, result, total in fetched:
+        request_time = sum(
+            timing["latency"] for timing in api.request_timings if timing["source"] == source
+        )
+        source_timings[source] = {
+            "total": total,
+            "request": request_time,
+            # concurrent requests of one source (wireguard) make this an underestimate
+            "parse": max(total - request_time, 0.0),
+            "records": len(result),
+        }
+
+    merge_start = time.perf_counter()
+    devices, active_keys = vyos_client.merge_devices(
+        results["static_mapping"],
+        results["dhcp_lease"],
+        results["arp"],
+        ndp_table=results.get("ndp", None),
+        conntrack_activity=results.get("conntrack", None),
+        wireguard_peers=results.get("wireguard", None),
+        device_filter=device_filter,
+    )
+    merge_time = time.perf_counter() - merge_start
+
+    return {
+        "timestamp": time.time(),
+        "poll_time": time.perf_counter() - poll_start,
+        "merge_time": merge_time,
+        "requests": list(api.request_timings),
+        "sources": source_timings,
+        "devices": [
+            {"key": key, "present": key in active_keys, **params}
+            for key, params in sorted(devices.items())
+        ],
+    }
+
+
+def print_table(poll: dict[str, Any], file=sys.stdout) -> None:
+    """Print the devices and the timings of one poll in human readable tables."""
+    columns = ("key", "ip", "hostname", "interface", "arp_state", "present")
+    rows = [
+        [str(device.get(column, "") if device.get(column, None) is not None else "") for column in columns]
+        for device in poll["devices"]
+    ]
+    widths = [
+        max([len(column)] + [len(row[index]) for row in rows]) for index, column in enumerate(columns)
+    ]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)), file=file)
+    print("  ".join("-" * width for width in widths), file=file)
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)), file=file)
+    print(file=file)
+
+    print(f"{'request':<50}  {'latency (ms)':>12}", file=file)
+    for timing in poll["requests"]:
+        print(f"{timing['path']:<50}  {timing['latency'] * 1000:>12.2f}", file=file)
+    print(file=file)
+    print(f"{'source':<16}  {'records':>8}  {'request (ms)':>12}  {'parse (ms)':>10}", file=file)
+    for source, timing in poll["sources"].items():
+        print(
+            f"{source:<16}  {timing['records']:>8}  {timing['request'] * 1000:>12.2f}  {timing['parse'] * 1000:>10.2f}",
+            file=file,
+        )
+    print(file=file)
+    print(
+        f"devices: {len(poll['devices'])}  present: {sum(device['present'] for device in poll['devices'])}  "
+        f"merge: {poll['merge_time'] * 1000:.2f} ms  poll: {poll['poll_time'] * 1000:.2f} ms",
+        file=file,
+    )
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "url", nargs="?", default="", help="VyOS API url, for instance https://192.168.1.1:11443"
+    )
+    parser.add_argument("--key", default="", help="VyOS API key")
+    parser.add_argument("--verify-ssl", action="store_true")
+    parser.add_argument("--dhcp-server-version", type=int, default=7)
+    parser.add_argument(
+        "--interfaces", default="", help="comma separated interfaces to track, all when empty"
+    )
+    parser.add_argument("--include", default="", help="include rules, as in the integration options")
+    parser.add_argument("--exclude", default="", help="exclude rules, as in the integration options")
+    parser.add_argument("--no-ipv6", dest="ipv6", action="store_false", help="don't fetch the NDP table")
+    parser.add_argument("--conntrack", action="store_true", help="fetch the conntrack activity")
+    parser.add_argument("--conntrack-max-rows", type=int, default=50000)
+    parser.add_argument(
+        "--conntrack-max-clients",
+        type=int,
+        default=vyos_client.VyOSApi.CONNTRACK_MAX_CLIENTS,
+        help="distinct client ip aggregated from the conntrack table, as in the integration",
+    )
+    parser.add_argument("--wireguard", action="store_true", help="fetch the WireGuard peers")
+    parser.add_argument("--count", type=int, default=1, help="number of polls, 0 to poll forever")
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between polls")
+    parser.add_argument("--json", action="store_true", help="print one JSON document per poll")
+    parser.add_argument("--record", metavar="PATH", help="record the anonymised responses to a capture file")
+    parser.add_argument("--replay", metavar="PATH", help="replay a capture file instead of polling a router")
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        help="1 waits the recorded latencies, 0 replays at maximum speed",
+    )
+    args = parser.parse_args(argv)
+    if args.replay:
+        if args.record:
+            parser.error("--record and --replay are exclusive")
+        args.url = args.url or "http://replay"
+    elif not args.url or not args.key:
+        parser.error("the url and --key are required unless replaying a capture")
+    args.interfaces = [iface.strip() for iface in args.interfaces.split(",") if iface.strip()]
+    return args
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    recorder = (
+        vyos_client.CaptureRecorder.open(
+            args.record, flags={name: getattr(args, name) for name in CAPTURE_FLAGS}
+        )
+        if args.record
+        else None
+    )
+    if args.replay:
+        session = vyos_client.ReplaySession.load(args.replay, args.replay_speed)
+        for name in CAPTURE_FLAGS:
+            if name in session.flags:
+                setattr(args, name, session.flags[name])
+    else:
+        session = aiohttp.ClientSession()
+    api = TimedVyOSApi(session, args.url, args.key, args.verify_ssl, recorder=recorder)
+    try:
+        poll_number = 0
+        while args.count == 0 or poll_number < args.count:
+            if poll_number > 0:
+                await asyncio.sleep(args.interval)
+            poll_number += 1
+            try:
+                poll = await poll_once(api, args)
+            except vyos_client.VyOSApiError as err:
+                print(f"poll {poll_number} failed: {err!r}", file=sys.stderr)
+                continue
+            if args.json:
+                print(json.dumps(poll), flush=True)
+            else:
+                print_table(poll)
+    finally:
+        await api.close()
+        await session.close()
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        return asyncio.run(async_main(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
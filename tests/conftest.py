@@ -0,0 +1,16 @@
+"""The tests only cover the modules without Home Assistant, imported from the component directory."""
+import os
+import sys
+import types
+
+COMPONENT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "vyos")
+)
+sys.path.insert(0, COMPONENT_DIR)
+
+# the modules using relative imports are imported from a package of the component directory,
+# without running its __init__, which needs Home Assistant
+COMPONENT_PACKAGE = "vyos_component"
+_package = types.ModuleType(COMPONENT_PACKAGE)
+_package.__path__ = [COMPONENT_DIR]
+sys.modules[COMPONENT_PACKAGE] = _package
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from aggregator import PresenceAggregator
+
+NOW = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+DETECTION_TIME = timedelta(minutes=5)
+
+
+class Device:
+    def __init__(self, last_seen=None, is_present=False):
+        self.last_seen = last_seen
+        self.is_present = is_present
+
+
+def test_present_when_any_router_considers_it_present():
+    aggregator = PresenceAggregator()
+    home = Device(NOW, is_present=True)
+    aggregator.register("router-a", [("aa:bb:cc:dd:ee:ff", Device(NOW))])
+    assert not aggregator.is_present("aa:bb:cc:dd:ee:ff")
+    aggregator.register("router-b", [("aa:bb:cc:dd:ee:ff", home)])
+    assert aggregator.is_present("aa:bb:cc:dd:ee:ff")
+    aggregator.unregister("router-b")
+    assert not aggregator.is_present("aa:bb:cc:dd:ee:ff")
+
+
+def test_primary_sighting_is_sticky_while_fresh():
+    aggregator = PresenceAggregator()
+    router_a = Device(NOW - timedelta(minutes=1))
+    router_b = Device(NOW)
+    aggregator.register("router-a", [("aa:bb:cc:dd:ee:ff", router_a)])
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", router_a, DETECTION_TIME, NOW) is router_a
+
+    # a fresher sighting of another router doesn't take over while the current one is within the detection time
+    aggregator.register("router-b", [("aa:bb:cc:dd:ee:ff", router_b)])
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", router_a, DETECTION_TIME, NOW) is router_a
+    later = NOW + timedelta(minutes=3)
+    router_b.last_seen = later
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", router_a, DETECTION_TIME, later) is router_a
+
+    # the current router lost the device, the freshest sighting becomes the primary and stays so
+    much_later = NOW + timedelta(minutes=7)
+    router_b.last_seen = much_later
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", router_a, DETECTION_TIME, much_later) is router_b
+    router_a.last_seen = much_later
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", router_a, DETECTION_TIME, much_later) is router_b
+
+
+def test_primary_defaults_without_sighting():
+    aggregator = PresenceAggregator()
+    default = Device()
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", default, DETECTION_TIME, NOW) is default
+    aggregator.register("router-a", [("aa:bb:cc:dd:ee:ff", Device())])
+    assert aggregator.primary("aa:bb:cc:dd:ee:ff", default, DETECTION_TIME, NOW) is default
+
+
+def test_first_claim_owns_the_device():
+    aggregator = PresenceAggregator()
+    assert aggregator.claim("aa:bb:cc:dd:ee:ff", "router-a")
+    assert not aggregator.claim("aa:bb:cc:dd:ee:ff", "router-b")
+    assert aggregator.owner("aa:bb:cc:dd:ee:ff") == "router-a"
+    aggregator.unregister("router-a")
+    assert aggregator.claim("aa:bb:cc:dd:ee:ff", "router-b")
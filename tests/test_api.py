@@ -0,0 +1,204 @@
+import asyncio
+import json
+
+from vyos_client import VyOSApi
+from vyos_client.capture import ReplayResponse
+
+LEGACY_UPTIME = " 12:00:00 up 2 days,  3:04,  1 user,  load average: 4.00, 2.00, 1.00\n"
+UPTIME = """Uptime: 2d 21h 18m 14s
+
+Load averages:
+1  minute:   80.0%
+5  minutes:  50.0%
+15 minutes:  40.0%
+"""
+
+
+class FakeSession:
+    """Answer the `show` requests from a dict of path to output."""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.requests = []
+
+    async def post(self, url, headers, data, **kwargs):
+        path = tuple(json.loads(data["data"])["path"])
+        self.requests.append(path)
+        if path not in self.outputs:
+            return ReplayResponse(404, json.dumps({"success": False, "data": None, "error": "not found"}))
+        return ReplayResponse(200, json.dumps({"success": True, "data": self.outputs[path], "error": None}))
+
+
+def test_load_averages_in_percent_of_the_cpu_capacity():
+    health = VyOSApi._parse_system_uptime(UPTIME)
+    assert (health["load_1m"], health["load_5m"], health["load_15m"]) == (80.0, 50.0, 40.0)
+    assert health["uptime"] == 2 * 86400 + 21 * 3600 + 18 * 60 + 14
+
+
+def test_legacy_load_averages_divided_by_the_cpu_count():
+    session = FakeSession(
+        {
+            ("system", "uptime"): LEGACY_UPTIME,
+            ("system", "memory"): "Total: 4096 MB\nFree: 1024 MB\nUsed: 3072 MB\n",
+            ("system", "cpu", "summary"): "CPU(s): 4\nCPU model(s): Intel(R) Atom(TM)\n",
+        }
+    )
+    api = VyOSApi(session, "https://router", "key")
+    health = asyncio.run(api.get_system_health())
+    assert (health["load_1m"], health["load_5m"], health["load_15m"]) == (100.0, 50.0, 25.0)
+    assert health["memory_used_percent"] == 75.0
+
+    # the cpu count is only fetched once
+    asyncio.run(api.get_system_health())
+    assert session.requests.count(("system", "cpu", "summary")) == 1
+
+
+def test_legacy_load_averages_unknown_without_the_cpu_count():
+    health = VyOSApi._parse_system_uptime(LEGACY_UPTIME)
+    assert health["load_1m"] is None
+
+
+ARP = """Address        Interface    Link layer address    State
+-------------  -----------  --------------------  ---------
+192.168.1.10   eth1         aa:bb:cc:dd:ee:01     REACHABLE
+192.168.1.11   eth1         aa:bb:cc:dd:ee:02     FAILED
+192.168.2.10   eth2         aa:bb:cc:dd:ee:03     STALE
+"""
+INTERFACES = """Codes: S - State, L - Link, u - Up, D - Down, A - Admin Down
+Interface        IP Address                        S/L  Description
+---------        ----------                        ---  -----------
+eth0             192.168.1.1/24                    u/u  LAN
+                 2001:db8::1/64
+eth1             -                                 u/u
+lo               127.0.0.1/8                       u/u
+"""
+
+
+def test_parse_table_collects_the_iterated_rows():
+    rows = list(VyOSApi._iter_table(ARP, column_names=["ip", "interface", "mac", "arp_state"]))
+    assert VyOSApi._parse_table(ARP, column_names=["ip", "interface", "mac", "arp_state"], key="ip") == {
+        row["ip"]: row for row in rows
+    }
+    assert VyOSApi._parse_table(ARP, column_names=["ip", "interface", "mac", "arp_state"])[0] == [
+        "192.168.1.10",
+        "eth1",
+        "aa:bb:cc:dd:ee:01",
+        "REACHABLE",
+    ]
+
+
+def test_present_arp_clients_match_the_iterated_entries():
+    api = VyOSApi(FakeSession({("arp",): ARP}), "https://router", "key")
+
+    async def collect():
+        return [entry async for entry in api.iter_arp_entries(["eth1", "eth2"])]
+
+    entries = asyncio.run(collect())
+    assert [entry["ip"] for entry in entries] == ["192.168.1.10", "192.168.2.10"]
+    assert asyncio.run(api.get_present_arp_clients(["eth1"])) == {"192.168.1.10": entries[0]}
+
+
+def test_interface_addresses_with_continuation_lines():
+    api = VyOSApi(FakeSession({("interfaces",): INTERFACES}), "https://router", "key")
+    assert asyncio.run(api.get_interface_addresses()) == {
+        "eth0": ["192.168.1.1/24", "2001:db8::1/64"],
+        "eth1": [],
+        "lo": ["127.0.0.1/8"],
+    }
+
+
+CONNTRACK_TABLE = """Id          Original src        Original dst        Reply src           Reply dst           Protocol    State        Timeout    Mark    Zone
+----------  ------------------  ------------------  ------------------  ------------------  ----------  -----------  ---------  ------  ------
+1           192.168.1.10:52345  1.1.1.1:443         1.1.1.1:443         192.168.1.10:52345  tcp         ESTABLISHED  431999     0
+2           192.168.1.10:52346  1.1.1.1:443         1.1.1.1:443         192.168.1.10:52346  tcp         TIME_WAIT    120        0
+3           192.168.1.11:5353   224.0.0.251:5353    224.0.0.251:5353    192.168.1.11:5353   udp                      30         0
+"""
+CONNTRACK_RAW = """tcp      6 431999 ESTABLISHED src=192.168.1.10 dst=1.1.1.1 sport=52345 dport=443 packets=3 bytes=180 src=1.1.1.1 dst=192.168.1.10 sport=443 dport=52345 packets=2 bytes=120 [ASSURED] mark=0 use=1
+tcp      6 110 TIME_WAIT src=192.168.1.10 dst=1.1.1.1 sport=52346 dport=443 packets=3 bytes=180 src=1.1.1.1 dst=192.168.1.10 sport=443 dport=52346 packets=2 bytes=120 mark=0 use=1
+udp      17 29 src=192.168.1.11 dst=224.0.0.251 sport=5353 dport=5353 packets=1 bytes=60 [UNREPLIED] src=224.0.0.251 dst=192.168.1.11 sport=5353 dport=5353 packets=0 bytes=0 mark=0 use=1
+"""
+
+
+def test_conntrack_table_without_byte_counters():
+    activity = VyOSApi._parse_conntrack_activity(CONNTRACK_TABLE, max_rows=100, max_clients=10)
+    assert activity == {
+        "192.168.1.10": {"conntrack_flows": 1},
+        "192.168.1.11": {"conntrack_flows": 1},
+    }
+    assert activity.total_flows == 3
+
+
+def test_conntrack_raw_lines_with_byte_counters():
+    activity = VyOSApi._parse_conntrack_activity(
+        CONNTRACK_RAW, max_rows=100, max_clients=10, ip_filter=lambda ip: ip != "192.168.1.11"
+    )
+    assert activity == {"192.168.1.10": {"conntrack_flows": 1, "conntrack_bytes": 300}}
+    assert activity.total_flows == 3
+
+
+def test_conntrack_row_and_client_limits():
+    activity = VyOSApi._parse_conntrack_activity(CONNTRACK_RAW, max_rows=1, max_clients=10)
+    assert list(activity) == ["192.168.1.10"]
+    # the total counts every row, even past the limit
+    assert activity.total_flows == 3
+    activity = VyOSApi._parse_conntrack_activity(CONNTRACK_TABLE, max_rows=100, max_clients=1)
+    assert list(activity) == ["192.168.1.10"]
+
+
+WIREGUARD_SUMMARY = """interface: wg0
+  public key: 0123456789abcdef0123456789abcdef0123456789a=
+  private key: (hidden)
+  listening port: 51820
+
+peer: fedcba9876543210fedcba9876543210fedcba98765=
+  endpoint: 203.0.113.5:51820
+  allowed ips: 10.0.0.2/32, fd00::2/128
+  latest handshake: 1 minute, 20 seconds ago
+  transfer: 1.20 MiB received, 3.40 MiB sent
+
+peer: 00000000000000000000000000000000000000000000=
+  allowed ips: (none)
+"""
+
+
+def test_wireguard_handshake_durations():
+    assert VyOSApi._parse_wireguard_handshake("Now") == 0
+    assert VyOSApi._parse_wireguard_handshake("1 minute, 20 seconds ago") == 80
+    assert VyOSApi._parse_wireguard_handshake("2 days, 1 hour, 1 second ago") == 2 * 86400 + 3601
+    assert VyOSApi._parse_wireguard_handshake("(none)") is None
+
+
+def test_wireguard_summary_peers():
+    peers = VyOSApi._parse_wireguard_summary(WIREGUARD_SUMMARY, "wg0")
+    assert peers == {
+        "fedcba9876543210fedcba9876543210fedcba98765=": {
+            "public_key": "fedcba9876543210fedcba9876543210fedcba98765=",
+            "interface": "wg0",
+            "endpoint": "203.0.113.5:51820",
+            "allowed_ips": ["10.0.0.2/32", "fd00::2/128"],
+            "latest_handshake": 80,
+        },
+        "00000000000000000000000000000000000000000000=": {
+            "public_key": "00000000000000000000000000000000000000000000=",
+            "interface": "wg0",
+            "endpoint": None,
+            "allowed_ips": [],
+            "latest_handshake": None,
+        },
+    }
+
+
+def test_wireguard_peers_of_every_interface():
+    session = FakeSession(
+        {
+            ("interfaces", "wireguard", "wg0", "summary"): WIREGUARD_SUMMARY,
+            ("interfaces", "wireguard", "wg1", "summary"): "interface: wg1\n",
+        }
+    )
+    api = VyOSApi(session, "https://router", "key")
+    peers = asyncio.run(api.get_wireguard_peers(["wg0", "wg1"]))
+    assert len(peers) == 2
+    assert sorted(session.requests) == [
+        ("interfaces", "wireguard", "wg0", "summary"),
+        ("interfaces", "wireguard", "wg1", "summary"),
+    ]
@@ -0,0 +1,110 @@
+import json
+import asyncio
+import ipaddress
+
+from vyos_client import VyOSApi
+from vyos_client.capture import Anonymizer, CaptureRecorder, ReplaySession
+
+from test_api import ARP, FakeSession
+
+NEIGHBORS = """Address                    Interface    Link layer address    State
+-------------------------  -----------  --------------------  ---------
+fe80::a8bb:ccff:fedd:eeff  eth1         aa:bb:cc:dd:ee:ff     REACHABLE
+fe80::2bb:ccff:fedd:ee01   eth1         00:bb:cc:dd:ee:01     STALE
+2001:db8::10               eth1         aa:bb:cc:dd:ee:02     REACHABLE
+"""
+LEASES = """IP Address     MAC address        State    Lease start          Lease expiration     Remaining    Pool    Hostname
+-------------  -----------------  -------  -------------------  -------------------  -----------  ------  ----------
+192.168.1.10   aa:bb:cc:dd:ee:ff  active   2024/01/01 00:00:00  2024/01/02 00:00:00  23:00:00     LAN     phone-anna
+"""
+
+
+def test_mac_hash_keeps_the_shape_and_is_consistent():
+    anonymizer = Anonymizer(b"key")
+    hashed = anonymizer.mac("AA-BB-CC-DD-EE-FF")
+    assert len(hashed) == 17 and hashed[2] == "-" and hashed.isupper()
+    assert hashed != "AA-BB-CC-DD-EE-FF"
+    # the multicast and local bits are kept
+    assert int(hashed[:2], 16) & 0x03 == 0xAA & 0x03
+    assert anonymizer.mac("AA-BB-CC-DD-EE-FF") == hashed
+    assert Anonymizer(b"other key").mac("AA-BB-CC-DD-EE-FF") != hashed
+
+
+def test_hostname_hash_keeps_the_length_and_separators():
+    hashed = Anonymizer(b"key").hostname("phone-anna.lan")
+    assert len(hashed) == len("phone-anna.lan")
+    assert hashed[5] == "-" and hashed[10] == "."
+    assert "anna" not in hashed
+
+
+def test_eui64_address_rebuilt_from_the_hashed_mac():
+    anonymizer = Anonymizer(b"key")
+    hashed_mac = anonymizer.mac("aa:bb:cc:dd:ee:ff")
+    address = anonymizer.ipv6("fe80::a8bb:ccff:fedd:eeff")
+    assert len(address) == len("fe80::a8bb:ccff:fedd:eeff")
+    assert "a8bb" not in address and "eeff" not in address
+    mac_bytes = bytes.fromhex(hashed_mac.replace(":", ""))
+    eui64 = bytes((mac_bytes[0] ^ 0x02,)) + mac_bytes[1:3] + b"\xff\xfe" + mac_bytes[3:]
+    assert ipaddress.IPv6Address(address).packed == bytes.fromhex("fe80" + "00" * 6) + eui64
+    # the other addresses are kept
+    assert anonymizer.ipv6("2001:db8::10") == "2001:db8::10"
+    assert anonymizer.ipv6("FE80::A8BB:CCFF:FEDD:EEFF") == address.upper()
+
+
+def test_anonymised_tables_parse_the_same():
+    anonymizer = Anonymizer(b"key")
+    columns = ["ip", "interface", "mac", "arp_state"]
+    neighbors = VyOSApi._parse_table(anonymizer.text(NEIGHBORS), column_names=columns, key="ip")
+    assert len(neighbors) == 3
+    for neighbor in neighbors.values():
+        assert neighbor["interface"] == "eth1" and neighbor["arp_state"] in ("REACHABLE", "STALE")
+        assert len(neighbor["mac"]) == 17 and not neighbor["mac"].startswith(("aa:bb", "00:bb"))
+    assert "2001:db8::10" in neighbors
+    assert not any("ccff:fedd" in ip for ip in neighbors)
+
+    leases = VyOSApi._parse_table(anonymizer.text(LEASES), key="Pool")
+    lease = leases["LAN"]
+    assert lease["IP Address"] == "192.168.1.10"
+    assert lease["MAC address"] == anonymizer.mac("aa:bb:cc:dd:ee:ff")
+    assert lease["Hostname"] == anonymizer.hostname("phone-anna")
+
+
+def test_config_names_and_macs_anonymised():
+    anonymizer = Anonymizer(b"key")
+    config = anonymizer.config(
+        {"LAN": {"subnet": {"192.168.1.0/24": {"static-mapping": {"nas": {"mac": "aa:bb:cc:dd:ee:ff"}}}}}}
+    )
+    mapping = config["LAN"]["subnet"]["192.168.1.0/24"]["static-mapping"]
+    assert list(mapping) == [anonymizer.hostname("nas")]
+    assert mapping[anonymizer.hostname("nas")]["mac"] == anonymizer.mac("aa:bb:cc:dd:ee:ff")
+
+
+def test_record_then_replay(tmp_path):
+    capture_path = str(tmp_path / "router.jsonl")
+    recorder = CaptureRecorder(open(capture_path, "w", encoding="utf-8"), Anonymizer(b"key"), flags={"ipv6": False})
+    api = VyOSApi(FakeSession({("arp",): ARP}), "https://router", "key", recorder=recorder)
+
+    async def record():
+        clients = await api.get_present_arp_clients()
+        await api.close()
+        return clients
+
+    recorded = asyncio.run(record())
+    recorder.close()
+
+    with open(capture_path, encoding="utf-8") as capture_file:
+        entry = json.loads(capture_file.read().splitlines()[1])
+    assert entry["path"] == ["arp"] and entry["status"] == 200
+    assert "key" not in entry and "aa:bb:cc:dd:ee:01" not in entry["body"]
+
+    session = ReplaySession.load(capture_path)
+    assert session.flags == {"ipv6": False} and len(session) == 1
+    replay_api = VyOSApi(session, "http://replay", "")
+    replayed = asyncio.run(replay_api.get_present_arp_clients())
+    assert list(replayed) == list(recorded)
+    assert [client["mac"] for client in replayed.values()] == [
+        Anonymizer(b"key").mac(client["mac"]) for client in recorded.values()
+    ]
+    # a request which wasn't recorded is not found
+    missing = {"data": json.dumps({"op": "show", "path": ["ipv6", "neighbors"]})}
+    assert asyncio.run(session.post("http://replay/show", {}, missing)).status == 404
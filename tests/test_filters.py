@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from vyos_client import DeviceFilter, SubnetIndex, VyOSApi, merge_devices, parse_static_mapping
+from vyos_client.merge import dhcp_lease_filter
+
+from test_api import FakeSession
+
+DHCP_SERVER_CONFIG = {
+    "shared-network-name": {
+        "LAN": {
+            "subnet": {
+                "192.168.2.0/24": {
+                    "static-mapping": {
+                        "printer": {"ip-address": "192.168.2.20", "mac": "aa:bb:cc:00:00:20"},
+                    },
+                },
+            },
+        },
+        "GUEST": {
+            "subnet": {
+                "192.168.3.0/24": {
+                    "static-mapping": {
+                        "guest-tv": {"ip-address": "192.168.3.30", "mac": "aa:bb:cc:00:00:30"},
+                    },
+                },
+            },
+        },
+    }
+}
+INTERFACE_ADDRESSES = {"eth2": ["192.168.2.1/24", "2001:db8::1/64"], "eth3": ["192.168.3.1/24"], "lo": []}
+
+
+def lease(ip, mac, pool):
+    return {"ip": ip, "mac": mac, "lease_state": "active", "pool": pool, "hostname": ""}
+
+
+@pytest.fixture
+def subnet_index():
+    return SubnetIndex.build(DHCP_SERVER_CONFIG, INTERFACE_ADDRESSES)
+
+
+def test_subnet_index_locates_by_ip_and_pool(subnet_index):
+    assert subnet_index.locate("192.168.2.50") == ("192.168.2.0/24", "LAN", "eth2")
+    assert subnet_index.locate(None, "GUEST") == ("192.168.3.0/24", "GUEST", "eth3")
+    assert subnet_index.locate("10.0.0.1") is None
+
+
+def test_subnet_interface_config_wins():
+    config = {"shared-network-name": {"LAN": {"subnet": {"192.168.2.0/24": {"interface": "br0"}}}}}
+    assert SubnetIndex.build(config, INTERFACE_ADDRESSES).locate("192.168.2.5")[2] == "br0"
+
+
+LEASE_TABLE = """IP Address     MAC address        State    Lease start          Lease expiration     Remaining    Pool    Hostname
+-------------  -----------------  -------  -------------------  -------------------  -----------  ------  ----------
+192.168.2.2    aa:bb:cc:00:00:02  active   2024/01/01 00:00:00  2024/01/02 00:00:00  23:00:00     LAN     laptop
+192.168.3.3    aa:bb:cc:00:00:03  active   2024/01/01 00:00:00  2024/01/02 00:00:00  23:00:00     GUEST   guest-phone
+"""
+
+
+def test_include_interface_drops_leases_of_other_segments_while_parsed(subnet_index):
+    device_filter = DeviceFilter(include="iface:eth2")
+    api = VyOSApi(FakeSession({("dhcp", "server", "leases", "state", "all"): LEASE_TABLE}), "https://router", "key")
+    leases = asyncio.run(api.get_dhcp_lease(record_filter=dhcp_lease_filter(subnet_index, device_filter)))
+    static_mapping = parse_static_mapping(DHCP_SERVER_CONFIG, "mac", device_filter, subnet_index)
+
+    assert list(leases) == ["aa:bb:cc:00:00:02"]
+    assert leases["aa:bb:cc:00:00:02"]["interface"] == "eth2"
+    assert leases["aa:bb:cc:00:00:02"]["subnet"] == "192.168.2.0/24"
+    assert list(static_mapping) == ["aa:bb:cc:00:00:20"]
+    assert static_mapping["aa:bb:cc:00:00:20"]["interface"] == "eth2"
+
+    devices, _active_keys = merge_devices(static_mapping, leases, {}, device_filter=device_filter)
+    assert set(devices) == {"aa:bb:cc:00:00:02", "aa:bb:cc:00:00:20"}
+    # the sources are not modified
+    assert "arp_state" not in leases["aa:bb:cc:00:00:02"]
+
+
+def test_exclude_interface_applies_to_static_mappings(subnet_index):
+    static_mapping = parse_static_mapping(
+        DHCP_SERVER_CONFIG, "mac", DeviceFilter(exclude="iface:eth3"), subnet_index
+    )
+    assert set(static_mapping) == {"aa:bb:cc:00:00:20"}
+
+
+def test_static_mappings_located_without_filter(subnet_index):
+    static_mapping = parse_static_mapping(DHCP_SERVER_CONFIG, "mac", subnet_index=subnet_index)
+    assert static_mapping["aa:bb:cc:00:00:30"]["interface"] == "eth3"
+    assert "interface" not in parse_static_mapping(DHCP_SERVER_CONFIG, "mac")["aa:bb:cc:00:00:30"]
+
+
+def test_ipv4_network_rule_keeps_ipv6_neighbors(subnet_index):
+    device_filter = DeviceFilter(include="net:192.168.2.0/24")
+    assert device_filter({"ip": "fe80::1", "mac": "aa:bb:cc:00:00:02", "interface": "eth2", "arp_state": "REACHABLE"})
+    assert device_filter({"ip": "192.168.2.2", "mac": "aa:bb:cc:00:00:02"})
+    assert not device_filter({"ip": "192.168.3.3", "mac": "aa:bb:cc:00:00:03"})
+
+    ndp_table = {
+        "fe80::2": {"ip": "fe80::2", "mac": "aa:bb:cc:00:00:02", "interface": "eth2", "arp_state": "REACHABLE"},
+        "fe80::3": {"ip": "fe80::3", "mac": "aa:bb:cc:00:00:03", "interface": "eth3", "arp_state": "REACHABLE"},
+    }
+    lease_filter = dhcp_lease_filter(subnet_index, device_filter)
+    leases = {
+        mac: lease_record
+        for mac, lease_record in (
+            ("aa:bb:cc:00:00:02", lease("192.168.2.2", "aa:bb:cc:00:00:02", "LAN")),
+            ("aa:bb:cc:00:00:03", lease("192.168.3.3", "aa:bb:cc:00:00:03", "GUEST")),
+        )
+        if lease_filter(lease_record)
+    }
+    devices, active_keys = merge_devices(
+        {},
+        leases,
+        {},
+        ndp_table={ip: entry for ip, entry in ndp_table.items() if device_filter(entry)},
+        device_filter=device_filter,
+    )
+    assert set(devices) == {"aa:bb:cc:00:00:02"}
+    assert devices["aa:bb:cc:00:00:02"]["ipv6_addresses"] == ["fe80::2"]
+    assert active_keys == {"aa:bb:cc:00:00:02"}
+
+
+def test_ipv6_network_rule_applies_to_ipv6_records():
+    device_filter = DeviceFilter(include="net:2001:db8::/64")
+    assert device_filter({"ip": "2001:db8::5"})
+    assert not device_filter({"ip": "2001:db9::5"})
+    # ipv4 records aren't targeted by ipv6 rules
+    assert device_filter({"ip": "192.168.2.2"})
+
+
+def test_invalid_rule():
+    with pytest.raises(ValueError):
+        DeviceFilter(include="vlan:10")
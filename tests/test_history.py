@@ -0,0 +1,84 @@
+import pytest
+
+from history import SAMPLES_SIZE, TRANSITIONS_SIZE, PresenceHistory, RingBuffer
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(4)
+    for timestamp in range(6):
+        ring.append(timestamp, timestamp % 2)
+    assert len(ring) == 4
+    assert list(ring) == [(2, 0), (3, 1), (4, 0), (5, 1)]
+    assert ring.last() == (5, 1)
+    assert ring.count_since(4) == 2
+    times, values = ring.ordered_arrays()
+    assert list(times) == [2, 3, 4, 5]
+    assert list(values) == [0, 1, 0, 1]
+
+
+def test_ring_buffer_load_keeps_newest():
+    ring = RingBuffer(3)
+    ring.append(100, 1)
+    ring.load(list(range(5)), [1, 0, 1, 0, 1])
+    assert list(ring) == [(2, 1), (3, 0), (4, 1)]
+
+
+def test_empty_ring_buffer():
+    ring = RingBuffer(3)
+    assert list(ring) == []
+    assert ring.last() is None
+    assert ring.count_since(0) == 0
+
+
+def make_history():
+    history = PresenceHistory()
+    for index in range(TRANSITIONS_SIZE + 10):
+        history.record_transition(1000 + index * 60, bool(index % 2))
+    for index in range(SAMPLES_SIZE + 10):
+        history.record_sample(1000 + index * 60, "REACHABLE" if index % 3 else None)
+    return history
+
+
+def test_record_sample_only_on_change_or_interval():
+    history = PresenceHistory()
+    history.record_sample(0, "REACHABLE")
+    history.record_sample(10, "REACHABLE")
+    history.record_sample(20, "STALE")
+    history.record_sample(80, "STALE")
+    assert history.as_dict()["arp_state_samples"] == [[0, "REACHABLE"], [20, "STALE"], [80, "STALE"]]
+
+
+def test_serialise_round_trip():
+    history = make_history()
+    restored = PresenceHistory.from_bytes(history.to_bytes())
+    assert restored.as_dict() == history.as_dict()
+    assert len(restored.transitions) == TRANSITIONS_SIZE
+    assert restored.flap_count(1000 + (TRANSITIONS_SIZE + 10) * 60) == TRANSITIONS_SIZE
+    # the restored buffers keep appending after the newest entry
+    restored.record_transition(10**6, True)
+    assert restored.transitions.last() == (10**6, 1)
+
+
+def test_empty_round_trip():
+    restored = PresenceHistory.from_bytes(PresenceHistory().to_bytes())
+    assert restored.as_dict() == {"transitions": [], "arp_state_samples": []}
+
+
+@pytest.mark.parametrize("length", [0, 3, PresenceHistory.HEADER.size, PresenceHistory.HEADER.size + 10])
+def test_truncated_blob(length):
+    data = make_history().to_bytes()
+    with pytest.raises(ValueError, match="Truncated"):
+        PresenceHistory.from_bytes(data[:length])
+
+
+def test_counts_beyond_data_are_truncated():
+    data = PresenceHistory.HEADER.pack(PresenceHistory.VERSION, TRANSITIONS_SIZE, 0xFFFF, SAMPLES_SIZE, 0)
+    with pytest.raises(ValueError, match="Truncated"):
+        PresenceHistory.from_bytes(data + b"\x00" * 64)
+
+
+def test_unknown_version():
+    data = bytearray(make_history().to_bytes())
+    data[0] = PresenceHistory.VERSION + 1
+    with pytest.raises(ValueError, match="version"):
+        PresenceHistory.from_bytes(bytes(data))
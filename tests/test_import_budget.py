@@ -0,0 +1,11 @@
+import os
+import importlib.util
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "check_import_budget.py")
+
+
+def test_client_import_budget():
+    spec = importlib.util.spec_from_file_location("check_import_budget", SCRIPT)
+    check_import_budget = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(check_import_budget)
+    assert check_import_budget.main([]) == 0
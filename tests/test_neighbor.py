@@ -0,0 +1,46 @@
+from vyos_client import VyOSApi
+from vyos_client.neighbor import NeighborIndex
+
+IP_NEIGHBOR = """fe80::a8bb:ccff:fedd:eeff dev eth1 lladdr aa:bb:cc:dd:ee:ff router REACHABLE
+2001:db8::10 dev eth1 lladdr aa:bb:cc:dd:ee:ff STALE
+fe80::2 dev eth2  FAILED
+2001:db8::20 dev eth2 lladdr aa:bb:cc:dd:ee:02 DELAY
+"""
+
+
+def test_ip_neighbor_lines():
+    neighbors = VyOSApi._parse_ip_neighbor_lines(IP_NEIGHBOR)
+    assert neighbors["fe80::a8bb:ccff:fedd:eeff"] == {
+        "ip": "fe80::a8bb:ccff:fedd:eeff",
+        "interface": "eth1",
+        "mac": "aa:bb:cc:dd:ee:ff",
+        "arp_state": "REACHABLE",
+    }
+    assert neighbors["fe80::2"] == {"ip": "fe80::2", "interface": "eth2", "mac": "", "arp_state": "FAILED"}
+    assert len(neighbors) == 4
+
+
+def test_ip_neighbor_lines_filtered_to_present_entries():
+    neighbors = VyOSApi._parse_ip_neighbor_lines(IP_NEIGHBOR, VyOSApi._make_neighbor_filter(["eth1"]))
+    assert list(neighbors) == ["fe80::a8bb:ccff:fedd:eeff", "2001:db8::10"]
+
+
+def test_neighbor_index_by_mac():
+    arp_table = {
+        "192.168.1.10": {"ip": "192.168.1.10", "mac": "aa:bb:cc:dd:ee:ff", "interface": "eth1", "arp_state": "STALE"},
+        "192.168.1.11": {"ip": "192.168.1.11", "mac": "", "interface": "eth1", "arp_state": "REACHABLE"},
+    }
+    ndp_table = VyOSApi._parse_ip_neighbor_lines(IP_NEIGHBOR, VyOSApi._make_neighbor_filter([]))
+    index = NeighborIndex.build(arp_table, ndp_table)
+    assert sorted(index) == ["aa:bb:cc:dd:ee:02", "aa:bb:cc:dd:ee:ff"]
+
+    entry = index["aa:bb:cc:dd:ee:ff"]
+    assert entry.ipv4 == ["192.168.1.10"]
+    assert entry.ipv6 == ["fe80::a8bb:ccff:fedd:eeff", "2001:db8::10"]
+    # the strongest state of all the addresses, with its interface
+    assert (entry.state, entry.interface) == ("REACHABLE", "eth1")
+    # IPv4 is the primary address
+    assert entry.ip == "192.168.1.10"
+
+    ipv6_only = index["aa:bb:cc:dd:ee:02"]
+    assert (ipv6_only.ip, ipv6_only.state, ipv6_only.interface) == ("2001:db8::20", "DELAY", "eth2")
@@ -0,0 +1,53 @@
+import collections
+
+import pytest
+
+import oui
+
+
+@pytest.fixture(scope="module")
+def database():
+    database = oui.OUIDatabase()
+    database.load()
+    yield database
+    database.close()
+
+
+def test_bundled_database_has_every_prefix_length():
+    with open(oui.OUI_DB_PATH, "rb") as db_file:
+        content = db_file.read()
+    _magic, count = oui.OUIDatabase.HEADER.unpack_from(content, 0)
+    record_size = oui.OUIDatabase.RECORD.size
+    record_bits = collections.Counter(
+        # the low byte of the key holds the prefix bits
+        oui.OUIDatabase.RECORD.unpack_from(content, oui.OUIDatabase.HEADER.size + index * record_size)[0] & 0xFF
+        for index in range(count)
+    )
+    for bits in oui.OUIDatabase.PREFIX_BITS:
+        assert record_bits[bits] > 0, f"no {bits} bits prefix in {oui.OUI_DB_PATH}"
+
+
+@pytest.mark.parametrize(
+    "mac, vendor",
+    [
+        ("10:e9:92:00:00:00", "INGRAM MICRO SERVICES"),  # MA-L
+        ("00:55:da:10:00:01", "KoolPOS Inc."),  # MA-M
+        ("70:b3:d5:00:10:01", "SOREDI touch systems GmbH"),  # MA-S
+    ],
+)
+def test_lookup_most_specific_prefix(database, mac, vendor):
+    assert database.lookup(mac) == vendor
+
+
+def test_build_and_lookup(tmp_path):
+    path = tmp_path / "oui.bin"
+    path.write_bytes(
+        oui.OUIDatabase.build([(0xAABBCC, 24, "Large"), (0xAABBCC1, 28, "Medium"), (0xAABBCC123, 36, "Small")])
+    )
+    database = oui.OUIDatabase(str(path))
+    database.load()
+    assert database.lookup("aa:bb:cc:00:00:00") == "Large"
+    assert database.lookup("aa-bb-cc-10-00-00") == "Medium"
+    assert database.lookup("aabb.cc12.3456") == "Small"
+    assert database.lookup("00:00:00:00:00:00") is None
+    database.close()
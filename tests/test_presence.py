@@ -0,0 +1,146 @@
+import pytest
+
+from vyos_component.presence import (
+    GAP_DEVIATION_FACTOR,
+    MIN_GAP_SAMPLES,
+    MIN_LEARNED_TIMEOUT,
+    PRESENCE_ENTER_CONFIDENCE,
+    PRESENCE_LEAVE_CONFIDENCE,
+    PresenceConfidence,
+    presence_evidence,
+)
+
+DETECTION_TIME = 300
+POLL_INTERVAL = 10
+
+
+def poll(presence, arp_state, start, end, lease_state=None):
+    """Observe `arp_state` every poll from `start` to `end` excluded, return the times of the changes."""
+    changes = []
+    for now in range(start, end, POLL_INTERVAL):
+        if presence.observe(arp_state, lease_state, arp_state is not None, now, DETECTION_TIME):
+            changes.append(now)
+    return changes
+
+
+def test_joins_above_enter_threshold():
+    presence = PresenceConfidence()
+    assert presence.observe("REACHABLE", None, True, 0, DETECTION_TIME)
+    assert presence.present
+    assert presence.confidence >= PRESENCE_ENTER_CONFIDENCE
+
+
+def test_weak_evidence_doesnt_join():
+    presence = PresenceConfidence()
+    # a PROBE neighbor never reaches the enter threshold
+    assert poll(presence, "PROBE", 0, 100) == []
+    assert PRESENCE_LEAVE_CONFIDENCE < presence.confidence < PRESENCE_ENTER_CONFIDENCE
+    assert not presence.present
+
+
+def test_single_missed_poll_doesnt_leave():
+    presence = PresenceConfidence()
+    poll(presence, "REACHABLE", 0, 60)
+    assert not presence.observe(None, None, False, 60, DETECTION_TIME)
+    assert presence.present
+    assert not presence.observe("REACHABLE", None, True, 70, DETECTION_TIME)
+
+
+def test_absent_device_stays_until_detection_time():
+    presence = PresenceConfidence()
+    poll(presence, "REACHABLE", 0, 10)
+    # missing from the neighbor tables from 10 seconds on, its last REACHABLE was at 0
+    assert poll(presence, None, 10, 400) == [DETECTION_TIME]
+    assert not presence.present
+
+
+def test_stale_device_stays_until_detection_time():
+    presence = PresenceConfidence()
+    poll(presence, "REACHABLE", 0, 10)
+    assert poll(presence, "STALE", 10, 400) == [DETECTION_TIME]
+
+
+def test_ended_lease_leaves_before_detection_time():
+    presence = PresenceConfidence()
+    poll(presence, "REACHABLE", 0, 10)
+    changes = poll(presence, None, 10, 400, lease_state="expired")
+    assert len(changes) == 1
+    assert changes[0] < DETECTION_TIME
+
+
+def test_never_seen_absent_device_doesnt_join():
+    presence = PresenceConfidence()
+    assert poll(presence, None, 0, 100, lease_state="active") == []
+    assert presence.confidence <= PRESENCE_LEAVE_CONFIDENCE
+
+
+def test_absent_evidence_decays_toward_leave_threshold():
+    fresh = presence_evidence(None, None, False, 0, DETECTION_TIME)
+    late = presence_evidence(None, None, False, DETECTION_TIME - 1, DETECTION_TIME)
+    assert fresh == presence_evidence("STALE", None, True, 0, DETECTION_TIME)
+    assert fresh > late > PRESENCE_LEAVE_CONFIDENCE
+    assert presence_evidence(None, None, False, DETECTION_TIME, DETECTION_TIME) == PRESENCE_LEAVE_CONFIDENCE
+    assert presence_evidence(None, None, False, None, DETECTION_TIME) == 0.0
+
+
+def learn_gaps(presence, gap, count, start=0):
+    """Observe `count` REACHABLE sightings `gap` seconds apart, STALE in between, return the time of the last one."""
+    now = start
+    for _ in range(count):
+        presence.observe("REACHABLE", None, True, now, DETECTION_TIME)
+        for stale in range(now + POLL_INTERVAL, now + gap, POLL_INTERVAL):
+            presence.observe("STALE", None, True, stale, DETECTION_TIME)
+        now += gap
+    presence.observe("REACHABLE", None, True, now, DETECTION_TIME)
+    return now
+
+
+def test_detection_time_until_enough_gaps():
+    presence = PresenceConfidence()
+    learn_gaps(presence, 30, MIN_GAP_SAMPLES - 1)
+    assert presence.gap_samples == MIN_GAP_SAMPLES - 1
+    assert presence.away_timeout(DETECTION_TIME) == DETECTION_TIME
+
+
+def test_gap_estimator_converges():
+    presence = PresenceConfidence()
+    learn_gaps(presence, 120, 40)
+    assert presence.gap_mean == pytest.approx(120)
+    assert presence.gap_deviation == pytest.approx(0, abs=1)
+    assert presence.away_timeout(DETECTION_TIME) == pytest.approx(120, abs=4)
+
+
+def test_consecutive_reachable_polls_are_not_gaps():
+    presence = PresenceConfidence()
+    poll(presence, "REACHABLE", 0, 600)
+    assert presence.gap_samples == 0
+
+
+def test_learned_timeout_is_clamped():
+    short = PresenceConfidence()
+    learn_gaps(short, 20, 20)
+    assert short.away_timeout(DETECTION_TIME) == MIN_LEARNED_TIMEOUT
+    long = PresenceConfidence()
+    learn_gaps(long, 280, MIN_GAP_SAMPLES)
+    assert long.gap_mean + GAP_DEVIATION_FACTOR * long.gap_deviation > DETECTION_TIME
+    assert long.away_timeout(DETECTION_TIME) == DETECTION_TIME
+    # a silence longer than the detection time is an absence, not a gap
+    absent = PresenceConfidence()
+    learn_gaps(absent, DETECTION_TIME + 10, 10)
+    assert absent.gap_samples == 0
+
+
+def test_learned_timeout_bounds_absence():
+    presence = PresenceConfidence()
+    last = learn_gaps(presence, 150, 20)
+    away_timeout = presence.away_timeout(DETECTION_TIME)
+    assert 150 <= away_timeout < DETECTION_TIME
+    assert presence.present
+    # missing from the neighbor tables for less than its learned timeout, it stays at home
+    short_absence = last + int(away_timeout) - POLL_INTERVAL
+    assert poll(presence, None, last + POLL_INTERVAL, short_absence) == []
+    assert not presence.observe("REACHABLE", None, True, short_absence, DETECTION_TIME)
+    # and leaves once the absence reaches it, well before the detection time
+    changes = poll(presence, None, short_absence + POLL_INTERVAL, short_absence + DETECTION_TIME)
+    assert len(changes) == 1
+    assert away_timeout <= changes[0] - short_absence < away_timeout + POLL_INTERVAL
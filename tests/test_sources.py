@@ -0,0 +1,44 @@
+import asyncio
+
+from vyos_client import DeviceFilter, VyOSApi
+from vyos_client.sources import fetch_static_mapping, fetch_wireguard_config, fetch_wireguard_peers
+
+from test_api import WIREGUARD_SUMMARY, FakeSession
+from test_filters import DHCP_SERVER_CONFIG, INTERFACE_ADDRESSES
+
+
+def test_static_mapping_located_and_filtered():
+    session = FakeSession({("service", "dhcp-server", "shared-network-name"): DHCP_SERVER_CONFIG})
+    api = VyOSApi(session, "https://router", "key")
+    static_mapping, subnet_index = asyncio.run(
+        fetch_static_mapping(api, "mac", INTERFACE_ADDRESSES, DeviceFilter(include="iface:eth3"))
+    )
+    assert list(static_mapping) == ["aa:bb:cc:00:00:30"]
+    assert static_mapping["aa:bb:cc:00:00:30"]["interface"] == "eth3"
+    assert len(subnet_index) == 2
+
+
+def test_wireguard_peers_named_from_the_config():
+    config = {"wg0": {"peer": {"laptop": {"public-key": "fedcba9876543210fedcba9876543210fedcba98765="}}}}
+    api = VyOSApi(
+        FakeSession(
+            {
+                ("interfaces", "wireguard"): config,
+                ("interfaces", "wireguard", "wg0", "summary"): WIREGUARD_SUMMARY,
+            }
+        ),
+        "https://router",
+        "key",
+    )
+
+    async def fetch():
+        return await fetch_wireguard_peers(api, await fetch_wireguard_config(api))
+
+    peers = asyncio.run(fetch())
+    assert peers["fedcba9876543210fedcba9876543210fedcba98765="]["name"] == "laptop"
+    assert peers["00000000000000000000000000000000000000000000="]["name"] is None
+
+
+def test_wireguard_config_empty_without_interface():
+    api = VyOSApi(FakeSession({}), "https://router", "key")
+    assert asyncio.run(fetch_wireguard_config(api)) == {}